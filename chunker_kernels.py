@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Compiled Kernels for the Semantic Text Chunker
+
+Holds the greedy max-min sentence selection loop used by
+SemanticTextChunker.max_min_chunking, JIT-compiled with Numba when it is
+installed. Without Numba the chunker keeps its NumPy implementation.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _select_chunks(embeddings: np.ndarray,
+                   token_counts: np.ndarray,
+                   special_tokens: int,
+                   min_tokens: int,
+                   max_tokens: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Greedily group sentences into max-min chunks.
+
+    Mirrors SemanticTextChunker.max_min_chunking: each chunk starts at the
+    first remaining sentence and repeatedly takes the remaining sentence that
+    fits under max_tokens and has the highest minimum similarity to the chunk.
+
+    Args:
+        embeddings: L2-normalized float32 sentence embeddings, shape (N, d)
+        token_counts: Per-sentence token counts (int64), excluding special tokens
+        special_tokens: Special tokens added once per chunk
+        min_tokens: Minimum tokens per chunk
+        max_tokens: Maximum tokens per chunk
+
+    Returns:
+        Tuple of (order, starts): sentence indices in chunk order, and the
+        offsets into `order` at which each chunk starts, followed by N
+    """
+    n, dim = embeddings.shape
+    remaining = np.ones(n, dtype=np.bool_)
+    min_similarities = np.empty(n, dtype=np.float32)
+    order = np.empty(n, dtype=np.int64)
+    starts = np.empty(n + 1, dtype=np.int64)
+    n_placed = 0
+    n_chunks = 0
+    seed_idx = 0
+
+    while n_placed < n:
+        # Start new chunk with first remaining sentence
+        while not remaining[seed_idx]:
+            seed_idx += 1
+        remaining[seed_idx] = False
+        starts[n_chunks] = n_placed
+        n_chunks += 1
+        order[n_placed] = seed_idx
+        n_placed += 1
+        chunk_tokens = special_tokens + token_counts[seed_idx]
+
+        for i in range(n):
+            if remaining[i]:
+                similarity = np.float32(0.0)
+                for j in range(dim):
+                    similarity += embeddings[i, j] * embeddings[seed_idx, j]
+                min_similarities[i] = similarity
+
+        # Greedy max-min selection
+        while n_placed < n and chunk_tokens < max_tokens:
+            best_idx = -1
+            best_similarity = np.float32(-1.0)
+            for i in range(n):
+                if (remaining[i] and chunk_tokens + token_counts[i] <= max_tokens
+                        and min_similarities[i] > best_similarity):
+                    best_idx = i
+                    best_similarity = min_similarities[i]
+
+            if best_idx < 0:
+                # No suitable sentence found, break if we have minimum tokens;
+                # otherwise add the next remaining sentence to meet minimum
+                if chunk_tokens < min_tokens:
+                    fallback_idx = seed_idx
+                    while not remaining[fallback_idx]:
+                        fallback_idx += 1
+                    remaining[fallback_idx] = False
+                    order[n_placed] = fallback_idx
+                    n_placed += 1
+                    chunk_tokens += token_counts[fallback_idx]
+                break
+
+            remaining[best_idx] = False
+            order[n_placed] = best_idx
+            n_placed += 1
+            chunk_tokens += token_counts[best_idx]
+
+            # Update minimum similarities against the added sentence only
+            for i in range(n):
+                if remaining[i]:
+                    similarity = np.float32(0.0)
+                    for j in range(dim):
+                        similarity += embeddings[i, j] * embeddings[best_idx, j]
+                    if similarity < min_similarities[i]:
+                        min_similarities[i] = similarity
+
+    starts[n_chunks] = n_placed
+    return order, starts[:n_chunks + 1]
+
+
+if NUMBA_AVAILABLE:
+    select_chunks = njit(cache=True, fastmath=True)(_select_chunks)
+else:
+    select_chunks = _select_chunks
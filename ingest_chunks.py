@@ -6,6 +6,7 @@ Loads semantic chunks from JSONL files, generates embeddings using appropriate m
 based on content type, and ingests them into ChromaDB.
 """
 
+import os
 import json
 import time
 import hashlib
@@ -62,17 +63,32 @@ class ChunkIngester:
         if not source_path.exists():
             raise ValueError(f"Source directory does not exist: {source_dir}")
         
-        # Find all JSONL files
-        jsonl_files = []
-        for pattern in ["**/*_semantic_chunks.jsonl", "**/*.jsonl"]:
-            jsonl_files.extend(source_path.glob(pattern))
-        
-        # Remove duplicates and sort
-        jsonl_files = sorted(set(jsonl_files))
+        # Find all JSONL files (*_semantic_chunks.jsonl included) in one walk
+        jsonl_files = sorted(self._scan_jsonl_files(source_path))
         
         self.logger.info(f"Discovered {len(jsonl_files)} JSONL files")
         return jsonl_files
     
+    def _scan_jsonl_files(self, directory: Path) -> Iterator[Path]:
+        """
+        Recursively yield JSONL files below a directory.
+        
+        Uses os.scandir, whose entries carry their file type, so no extra
+        stat() call is made per entry. Symlinked directories are not followed.
+        
+        Args:
+            directory: Directory to scan
+            
+        Yields:
+            JSONL file paths
+        """
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._scan_jsonl_files(Path(entry.path))
+                elif entry.name.endswith('.jsonl') and entry.is_file():
+                    yield Path(entry.path)
+    
     def load_chunks_from_file(self, file_path: Path) -> Iterator[Dict[str, Any]]:
         """
         Load chunks from a single JSONL file.
@@ -219,13 +235,15 @@ class ChunkIngester:
         
         return True, ""
     
-    def ingest_files(self, jsonl_files: List[Path], batch_size: int = 100) -> Dict[str, Any]:
+    def ingest_files(self, jsonl_files: List[Path], batch_size: int = 100,
+                     workers: int = 1) -> Dict[str, Any]:
         """
         Ingest chunks from multiple JSONL files.
         
         Args:
             jsonl_files: List of JSONL file paths
             batch_size: Number of chunks to process per batch
+            workers: Number of batches embedded concurrently
             
         Returns:
             Ingestion statistics
@@ -275,7 +293,7 @@ class ChunkIngester:
         # Ingest all chunks into database
         if all_chunks:
             self.logger.info(f"Ingesting {len(all_chunks)} chunks into database...")
-            ingest_result = self.db.add_chunks(all_chunks, batch_size=batch_size)
+            ingest_result = self.db.add_chunks(all_chunks, batch_size=batch_size, encode_workers=workers)
             self.stats["chunks_ingested"] = ingest_result["chunks_processed"]
             self.stats["errors"].extend(ingest_result["errors"])
         
@@ -302,13 +320,15 @@ class ChunkIngester:
     
     def ingest_from_directory(self, 
                              source_dir: str = None, 
-                             batch_size: int = 100) -> Dict[str, Any]:
+                             batch_size: int = 100,
+                             workers: int = 1) -> Dict[str, Any]:
         """
         Main ingestion method: discover files and ingest chunks.
         
         Args:
             source_dir: Directory containing semantic chunk files
             batch_size: Number of chunks to process per batch
+            workers: Number of batches embedded concurrently
             
         Returns:
             Ingestion statistics
@@ -323,7 +343,7 @@ class ChunkIngester:
             return {"files_processed": 0, "chunks_ingested": 0, "errors": ["No files found"]}
         
         # Ingest files
-        return self.ingest_files(jsonl_files, batch_size)
+        return self.ingest_files(jsonl_files, batch_size, workers)
     
     def write_ingestion_report(self, stats: Dict[str, Any]) -> None:
         """
@@ -368,11 +388,20 @@ class ChunkIngester:
         self.logger.info(f"Ingestion report written to: {report_dir}")
 
 
+def _positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main():
     """Main entry point for chunk ingestion."""
     parser = argparse.ArgumentParser(description="Ingest semantic chunks into vector database")
     parser.add_argument("--source-dir", help="Directory containing JSONL files")
     parser.add_argument("--batch-size", type=int, default=100, help="Batch size for processing")
+    parser.add_argument("--workers", type=_positive_int, default=1, help="Batches embedded concurrently")
     parser.add_argument("--config", default="vector_db_config.yaml", help="Configuration file path")
     parser.add_argument("--report", action="store_true", help="Generate detailed report")
     
@@ -385,7 +414,8 @@ def main():
         # Run ingestion
         stats = ingester.ingest_from_directory(
             source_dir=args.source_dir,
-            batch_size=args.batch_size
+            batch_size=args.batch_size,
+            workers=args.workers
         )
         
         # Generate report if requested
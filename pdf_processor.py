@@ -6,8 +6,12 @@ import hashlib
 import json
 import tqdm
 import re
+import threading
 from semantic_text_chunker import SemanticTextChunker
 
+# Guards the lazily created semantic chunker when manuals are processed in threads
+_chunker_lock = threading.Lock()
+
 
 def pdf2html(pdf_path: Path) -> str:
     """Convert PDF to HTML using pdfminer"""
@@ -111,12 +115,14 @@ def process_manual(pdf_path: Path, output_dir: Path, use_semantic: bool = False)
     if use_semantic:
         # Initialize semantic chunker (cached for reuse)
         if not hasattr(process_manual, '_chunker'):
-            print("Initializing semantic text chunker...")
-            process_manual._chunker = SemanticTextChunker(
-                target_tokens=600,
-                min_tokens=500, 
-                max_tokens=700
-            )
+            with _chunker_lock:
+                if not hasattr(process_manual, '_chunker'):
+                    print("Initializing semantic text chunker...")
+                    process_manual._chunker = SemanticTextChunker(
+                        target_tokens=600,
+                        min_tokens=500, 
+                        max_tokens=700
+                    )
         
         # Create semantic chunks
         try:
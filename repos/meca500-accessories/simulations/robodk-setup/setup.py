@@ -22,8 +22,14 @@ Author: Generated for Mecademic Robot Integration
 import sys
 import os
 import subprocess
+import importlib
 import importlib.util
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Make the user's config.py in the working directory importable
+if sys.path[0] != os.getcwd():
+    sys.path.insert(0, os.getcwd())
 
 def check_python_version():
     """Check if Python version is compatible"""
@@ -33,51 +39,69 @@ def check_python_version():
     print(f"✓ Python version: {sys.version}")
     return True
 
-def check_robodk_installation():
-    """Check if RoboDK is installed and accessible"""
+def _probe_robodk():
+    """Probe the RoboDK API and software without printing; returns (status, error)"""
     try:
-        # Try to import RoboDK API
         import robodk.robolink as rl
         import robodk.robomath as rm
-        
-        print("✓ RoboDK API is available")
-        
-        # Try to connect to RoboDK
-        try:
-            RDK = rl.Robolink()
-            if RDK.Valid():
-                print("✓ RoboDK software is running and accessible")
-                return True
-            else:
-                print("⚠ RoboDK software is not running")
-                print("  Please start RoboDK and try again")
-                return False
-        except Exception as e:
-            print(f"⚠ Cannot connect to RoboDK: {e}")
-            return False
-            
     except ImportError:
+        return "missing", None
+    
+    try:
+        RDK = rl.Robolink()
+        return ("running" if RDK.Valid() else "stopped"), None
+    except Exception as e:
+        return "unreachable", e
+
+def check_robodk_installation(probe_result=None):
+    """Check if RoboDK is installed and accessible"""
+    # Probe now unless the caller already ran _probe_robodk()
+    status, error = probe_result or _probe_robodk()
+    
+    if status == "missing":
         print("✗ RoboDK API not found")
         print("  Install with: pip install robodk")
         return False
+    
+    print("✓ RoboDK API is available")
+    
+    if status == "running":
+        print("✓ RoboDK software is running and accessible")
+        return True
+    elif status == "stopped":
+        print("⚠ RoboDK software is not running")
+        print("  Please start RoboDK and try again")
+        return False
+    else:
+        print(f"⚠ Cannot connect to RoboDK: {error}")
+        return False
+
+# Non-interactive pip invocation: no prompts, progress bars or version check
+PIP_INSTALL = [sys.executable, "-m", "pip", "install",
+               "--disable-pip-version-check", "--no-input", "--quiet"]
 
 def install_dependencies():
     """Install required Python packages"""
     print("Installing Python dependencies...")
     
+    env = dict(os.environ, PIP_NO_COLOR="1")
     try:
         # Check if requirements.txt exists
         if os.path.exists("requirements.txt"):
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+            subprocess.run(PIP_INSTALL + ["-r", "requirements.txt"],
+                           check=True, capture_output=True, env=env)
             print("✓ Dependencies installed successfully")
             return True
         else:
             # Install basic RoboDK package
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "robodk"])
+            subprocess.run(PIP_INSTALL + ["robodk"],
+                           check=True, capture_output=True, env=env)
             print("✓ RoboDK package installed")
             return True
     except subprocess.CalledProcessError as e:
         print(f"✗ Failed to install dependencies: {e}")
+        if e.stderr:
+            print(e.stderr.decode(errors="replace"))
         return False
 
 def create_sample_workspace():
@@ -94,6 +118,9 @@ def create_sample_workspace():
             print("✗ Cannot connect to RoboDK")
             return False
         
+        # Fetch the library path right after the handshake, before the station reset
+        library_path = RDK.getParam("PATH_LIBRARY")
+        
         # Clear existing workspace
         RDK.CloseStation()
         
@@ -102,7 +129,7 @@ def create_sample_workspace():
         
         # Add Meca500 robot from library
         print("  Adding Meca500 robot...")
-        robot_file = RDK.getParam("PATH_LIBRARY") + "/Mecademic-Meca500-R3.robot"
+        robot_file = library_path + "/Mecademic-Meca500-R3.robot"
         robot = RDK.AddFile(robot_file)
         
         if robot.Valid():
@@ -159,10 +186,17 @@ def validate_configuration():
         if os.path.exists("config.py"):
             print("  ✓ Configuration file found")
             
-            # Import config module
-            spec = importlib.util.spec_from_file_location("config", "config.py")
-            config = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(config)
+            # Import config module (cached in sys.modules after the first call)
+            try:
+                config = importlib.import_module("config")
+            except ImportError:
+                config = None
+            config_file = os.path.abspath(getattr(config, "__file__", None) or "")
+            if os.path.normcase(config_file) != os.path.normcase(os.path.abspath("config.py")):
+                # Another "config" module shadows ./config.py; load the file directly
+                spec = importlib.util.spec_from_file_location("config", "config.py")
+                config = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(config)
             
             # Run validation if available
             if hasattr(config, 'validate_config'):
@@ -198,12 +232,14 @@ def check_example_files():
     ]
     
     all_present = True
+    lines = []
     for file_name in files_to_check:
         if os.path.exists(file_name):
-            print(f"  ✓ {file_name}")
+            lines.append(f"  ✓ {file_name}")
         else:
-            print(f"  ✗ {file_name} - Missing")
+            lines.append(f"  ✗ {file_name} - Missing")
             all_present = False
+    sys.stdout.write("\n".join(lines) + "\n")
     
     return all_present
 
@@ -212,17 +248,23 @@ def run_system_check():
     print("RoboDK Meca500 Setup - System Check")
     print("=" * 40)
     
-    checks = [
-        ("Python Version", check_python_version),
-        ("RoboDK Installation", check_robodk_installation),
-        ("Example Files", check_example_files),
-        ("Configuration", validate_configuration)
-    ]
-    
-    results = {}
-    for check_name, check_func in checks:
-        print(f"\n{check_name}:")
-        results[check_name] = check_func()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Connecting to RoboDK is the only slow check, so start it in the
+        # background as early as possible; the other checks are local and
+        # print directly in the report order
+        robodk_probe = executor.submit(_probe_robodk)
+        
+        checks = [
+            ("Python Version", check_python_version),
+            ("RoboDK Installation", lambda: check_robodk_installation(robodk_probe.result())),
+            ("Example Files", check_example_files),
+            ("Configuration", validate_configuration)
+        ]
+        
+        results = {}
+        for check_name, check_func in checks:
+            print(f"\n{check_name}:")
+            results[check_name] = check_func()
     
     print("\n" + "=" * 40)
     print("SYSTEM CHECK SUMMARY:")
@@ -287,9 +329,12 @@ def main():
         return
     
     success = True
+    # run_system_check already validates the configuration; don't repeat it
+    config_validated = False
     
     if args.check_install or args.all:
         success &= run_system_check()
+        config_validated = True
     
     if args.install_deps or args.all:
         print("\nInstalling Dependencies:")
@@ -299,7 +344,7 @@ def main():
         print("\nCreating Sample Workspace:")
         success &= create_sample_workspace()
     
-    if args.validate_config or args.all:
+    if (args.validate_config or args.all) and not config_validated:
         print("\nValidating Configuration:")
         success &= validate_configuration()
     
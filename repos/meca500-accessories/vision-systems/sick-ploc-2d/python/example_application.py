@@ -21,7 +21,10 @@ Compatible with: SICK PLOC2D 4.1+, Meca500-R3/R4, Python 3.7+
 import time
 import sys
 import argparse
+import functools
 import logging
+import logging.handlers
+import queue
 from typing import List, Tuple, Optional
 from vision_controller import VisionController
 from vision_guided_pick import VisionGuidedPick
@@ -63,11 +66,15 @@ class SickPloc2DApplication:
             (-120, 120, 0, 180, 0, 180),   # Position 2  
             (-120, 140, 0, 180, 0, 180),   # Position 3
         ]
+        self._n_places = len(self.place_positions)
+        # Place calls pre-bound to each target position
+        self._place_fns = [functools.partial(self.app.place, *position)
+                           for position in self.place_positions]
         self.current_place_index = 0
         
         # Performance monitoring
         self.cycle_count = 0
-        self.total_cycle_time = 0.0
+        self._total_cycle_ns = 0
         self.successful_picks = 0
         self.failed_picks = 0
         
@@ -76,16 +83,40 @@ class SickPloc2DApplication:
         
         self.logger.info(f"Application initialized - Robot: {robot_ip}, Vision: {vision_ip}")
     
+    @property
+    def total_cycle_time(self) -> float:
+        """Total time spent in production cycles, in seconds."""
+        return self._total_cycle_ns * 1e-9
+    
     def _setup_logging(self) -> None:
-        """Setup logging configuration."""
-        logging.basicConfig(
-            level=logging.INFO if not self.debug else logging.DEBUG,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('sick_ploc2d_application.log'),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
+        """
+        Setup logging configuration.
+        
+        Log file writes are pushed onto a queue and drained by a background
+        listener thread, so the production loop never blocks on file I/O.
+        Console output stays synchronous to keep its ordering with print().
+        """
+        self._log_listener = None
+        formatter = logging.Formatter('{asctime} - {levelname} - {message}', style='{')
+        
+        # basicConfig is a no-op if the root logger is already configured
+        if not logging.getLogger().handlers:
+            log_queue = queue.Queue(-1)
+            # Records are fully formatted before being queued
+            queue_handler = logging.handlers.QueueHandler(log_queue)
+            queue_handler.setFormatter(formatter)
+            stream_handler = logging.StreamHandler(sys.stdout)
+            stream_handler.setFormatter(formatter)
+            
+            logging.basicConfig(
+                level=logging.INFO if not self.debug else logging.DEBUG,
+                handlers=[queue_handler, stream_handler]
+            )
+            self._log_listener = logging.handlers.QueueListener(
+                log_queue, logging.FileHandler('sick_ploc2d_application.log')
+            )
+            self._log_listener.start()
+        
         self.logger = logging.getLogger(__name__)
     
     def initialize_systems(self) -> bool:
@@ -180,6 +211,12 @@ class SickPloc2DApplication:
         
         vision_points = []
         
+        # When coordinates are piped in (scripted calibration), read them all
+        # at once instead of prompting for each value
+        scripted_values = None
+        if not sys.stdin.isatty():
+            scripted_values = iter(sys.stdin.read().split())
+        
         for i, (x, y, z) in enumerate(robot_points):
             self.logger.info(f"Moving to calibration point {i+1}: ({x}, {y}, {z})")
             
@@ -187,19 +224,23 @@ class SickPloc2DApplication:
             self.app.robot.MoveCartPoint(x, y, z, 0, 0, 0)
             self.app.robot.WaitMovementCompletion()
             
-            # Interactive input for vision coordinates
-            print(f"\nRobot positioned at calibration point {i+1}")
-            print(f"Robot coordinates: ({x:.1f}, {y:.1f}, {z:.1f})")
-            print("Please observe the corresponding coordinates in the vision system and enter them below:")
-            
             try:
-                vision_x = float(input(f"Vision X coordinate for point {i+1}: "))
-                vision_y = float(input(f"Vision Y coordinate for point {i+1}: "))
+                if scripted_values is not None:
+                    vision_x = float(next(scripted_values))
+                    vision_y = float(next(scripted_values))
+                else:
+                    # Interactive input for vision coordinates
+                    print(f"\nRobot positioned at calibration point {i+1}")
+                    print(f"Robot coordinates: ({x:.1f}, {y:.1f}, {z:.1f})")
+                    print("Please observe the corresponding coordinates in the vision system and enter them below:")
+                    
+                    vision_x = float(input(f"Vision X coordinate for point {i+1}: "))
+                    vision_y = float(input(f"Vision Y coordinate for point {i+1}: "))
                 vision_points.append((vision_x, vision_y))
                 
                 self.logger.info(f"Point {i+1} - Robot: ({x}, {y}, {z}), Vision: ({vision_x}, {vision_y})")
                 
-            except ValueError:
+            except (ValueError, StopIteration):
                 self.logger.error("Invalid coordinate input")
                 return False
         
@@ -220,8 +261,6 @@ class SickPloc2DApplication:
         Returns:
             bool: True if cycle completed, False if error occurred
         """
-        cycle_start_time = time.time()
-        
         try:
             # Get part count
             count = self.app.get_count(self.job_id)
@@ -230,39 +269,42 @@ class SickPloc2DApplication:
                 self.logger.warning("Failed to get part count from vision system")
                 return False
             
+            # Idle cycle - nothing to time or record
             if count == 0:
-                if self.debug:
-                    self.logger.debug("No parts detected")
+                self.logger.debug("No parts detected")
                 return True
             
-            self.logger.info(f"Processing {count} parts")
+            cycle_start_ns = time.perf_counter_ns()
+            self.logger.info("Processing %d parts", count)
             
             # Process each detected part
             for i in range(1, count + 1):
                 if not self._process_single_part(i):
-                    self.logger.warning(f"Failed to process part {i}")
+                    self.logger.warning("Failed to process part %d", i)
                     self.failed_picks += 1
                 else:
                     self.successful_picks += 1
                     
                     # Update place position for next part
-                    self.current_place_index = (self.current_place_index + 1) % len(self.place_positions)
+                    next_index = self.current_place_index + 1
+                    self.current_place_index = 0 if next_index == self._n_places else next_index
             
             # Update performance statistics
-            cycle_time = time.time() - cycle_start_time
+            cycle_ns = time.perf_counter_ns() - cycle_start_ns
             self.cycle_count += 1
-            self.total_cycle_time += cycle_time
+            self._total_cycle_ns += cycle_ns
             
-            avg_cycle_time = self.total_cycle_time / self.cycle_count
+            cycle_time = cycle_ns * 1e-9
+            avg_cycle_time = self._total_cycle_ns * 1e-9 / self.cycle_count
             success_rate = (self.successful_picks / (self.successful_picks + self.failed_picks)) * 100
             
-            self.logger.info(f"Cycle {self.cycle_count} completed in {cycle_time:.2f}s "
-                           f"(avg: {avg_cycle_time:.2f}s, success rate: {success_rate:.1f}%)")
+            self.logger.info("Cycle %d completed in %.2fs (avg: %.2fs, success rate: %.1f%%)",
+                             self.cycle_count, cycle_time, avg_cycle_time, success_rate)
             
             return True
             
         except Exception as e:
-            self.logger.error(f"Production cycle error: {e}")
+            self.logger.error("Production cycle error: %s", e)
             return False
     
     def _process_single_part(self, part_index: int) -> bool:
@@ -276,28 +318,25 @@ class SickPloc2DApplication:
             bool: True if part processed successfully, False otherwise
         """
         try:
-            part_start_time = time.time()
+            part_start_ns = time.perf_counter_ns()
             
             # Pick part
             if not self.app.pick_index(self.job_id, part_index):
-                self.logger.warning(f"Failed to pick part {part_index}")
+                self.logger.warning("Failed to pick part %d", part_index)
                 return False
             
-            # Get target place position
-            place_coords = self.place_positions[self.current_place_index]
-            
-            # Place part
-            if not self.app.place(*place_coords):
-                self.logger.warning(f"Failed to place part {part_index}")
+            # Place part at the current target position
+            if not self._place_fns[self.current_place_index]():
+                self.logger.warning("Failed to place part %d", part_index)
                 return False
             
-            part_time = time.time() - part_start_time
-            self.logger.info(f"Part {part_index} processed successfully in {part_time:.2f}s")
+            part_time = (time.perf_counter_ns() - part_start_ns) * 1e-9
+            self.logger.info("Part %d processed successfully in %.2fs", part_index, part_time)
             
             return True
             
         except Exception as e:
-            self.logger.error(f"Part processing error: {e}")
+            self.logger.error("Part processing error: %s", e)
             return False
     
     def run_continuous_operation(self, max_cycles: Optional[int] = None, 
@@ -335,10 +374,10 @@ class SickPloc2DApplication:
         except KeyboardInterrupt:
             self.logger.info("Operation interrupted by user")
         except Exception as e:
-            self.logger.error(f"Continuous operation error: {e}")
+            self.logger.error("Continuous operation error: %s", e)
         
         finally:
-            self.logger.info(f"Continuous operation completed - {cycles_completed} cycles")
+            self.logger.info("Continuous operation completed - %d cycles", cycles_completed)
             self._print_statistics()
     
     def _attempt_recovery(self) -> bool:
@@ -351,14 +390,15 @@ class SickPloc2DApplication:
         self.logger.info("Attempting system recovery...")
         
         try:
-            # Check vision system connection
-            if not self.app.vision_initialized:
+            # Check vision system connection - a cheap ping covers transient
+            # network blips, full re-initialization only if it fails
+            if not self.app.vision_initialized or not self.app.vision.ping():
                 self.logger.info("Reinitializing vision system...")
                 if not self.app.init_vision():
                     return False
             
             # Check robot connection
-            if not self.app.robot_initialized:
+            if not self.app.robot_initialized or not self._robot_connected():
                 self.logger.info("Reinitializing robot...")
                 if not self.app.init_robot():
                     return False
@@ -376,10 +416,25 @@ class SickPloc2DApplication:
             self.logger.error(f"Recovery attempt failed: {e}")
             return False
     
+    def _robot_connected(self) -> bool:
+        """
+        Cheap robot liveness check used before falling back to re-initialization.
+        
+        Returns:
+            bool: True if the robot reports a live connection, False otherwise
+                (including when the status query itself fails)
+        """
+        try:
+            return bool(self.app.robot.GetStatusRobot().Connected)
+        except Exception as e:
+            self.logger.warning(f"Robot status check failed: {e}")
+            return False
+    
     def _print_statistics(self) -> None:
         """Print operation statistics."""
         if self.cycle_count > 0:
-            avg_cycle_time = self.total_cycle_time / self.cycle_count
+            total_cycle_time = self.total_cycle_time
+            avg_cycle_time = total_cycle_time / self.cycle_count
             total_parts = self.successful_picks + self.failed_picks
             
             if total_parts > 0:
@@ -387,16 +442,18 @@ class SickPloc2DApplication:
             else:
                 success_rate = 0.0
             
-            print("\n" + "="*50)
-            print("OPERATION STATISTICS")
-            print("="*50)
-            print(f"Cycles completed: {self.cycle_count}")
-            print(f"Total cycle time: {self.total_cycle_time:.2f}s")
-            print(f"Average cycle time: {avg_cycle_time:.2f}s")
-            print(f"Successful picks: {self.successful_picks}")
-            print(f"Failed picks: {self.failed_picks}")
-            print(f"Success rate: {success_rate:.1f}%")
-            print("="*50)
+            sys.stdout.write(
+                "\n" + "="*50 + "\n"
+                "OPERATION STATISTICS\n"
+                + "="*50 + "\n"
+                f"Cycles completed: {self.cycle_count}\n"
+                f"Total cycle time: {total_cycle_time:.2f}s\n"
+                f"Average cycle time: {avg_cycle_time:.2f}s\n"
+                f"Successful picks: {self.successful_picks}\n"
+                f"Failed picks: {self.failed_picks}\n"
+                f"Success rate: {success_rate:.1f}%\n"
+                + "="*50 + "\n"
+            )
     
     def run_test_sequence(self) -> None:
         """
@@ -466,6 +523,12 @@ class SickPloc2DApplication:
             
         except Exception as e:
             self.logger.error(f"Shutdown error: {e}")
+        
+        finally:
+            # Drain queued log records before exiting
+            if self._log_listener is not None:
+                self._log_listener.stop()
+                self._log_listener = None
 
 
 def main():
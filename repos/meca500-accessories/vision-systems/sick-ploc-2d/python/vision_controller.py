@@ -168,6 +168,39 @@ class VisionController:
         
         return status
     
+    def ping(self, timeout: float = 0.2) -> bool:
+        """
+        Lightweight liveness check using a single STATUS round-trip.
+        
+        Args:
+            timeout (float): Socket timeout for the ping in seconds (default: 0.2)
+            
+        Returns:
+            bool: True if the system answered, False otherwise
+        """
+        if not self.connected:
+            return False
+        
+        try:
+            self.socket.settimeout(timeout)
+            try:
+                response = self._send_command("STATUS")
+            finally:
+                self.socket.settimeout(self.timeout)
+                
+        except Exception as e:
+            if self.debug:
+                print(f"Ping error: {e}")
+            response = None
+        
+        if not response:
+            # An empty read means the peer closed the connection; on timeout a
+            # late reply would be read by the next command, so drop the socket
+            self.disconnect()
+            return False
+        
+        return True
+    
     def locate(self, job_id: int = 1) -> Optional[List[Dict[str, float]]]:
         """
         Execute vision job and return all detected parts.
@@ -5,17 +5,169 @@ Semantic Code Chunker for AST-based Code Chunks
 Implements code chunking using AST boundaries with:
 1. Processing existing AST extractions 
 2. Comment/blank line stripping
-3. SHA1-based hash generation for chunk IDs
+3. SHA1-based (optionally BLAKE3) hash generation for chunk IDs
 4. Structured output with repo/commit/symbol metadata
 """
 
 import json
+import functools
 import hashlib
-import re
+import itertools
 import logging
+from collections import Counter
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 import subprocess
+import os
+import sys
+import struct
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from blake3 import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+# Languages stripped of // and /* */ comments
+C_LIKE_LANGUAGES = frozenset({'javascript', 'c', 'csharp'})
+
+# Chunk hashes are content-addressed IDs, not a security primitive
+HASH_ALGORITHMS = ('sha1', 'blake3')
+
+# Path components marking a repo root; chunk source paths are made relative to them
+REPO_INDICATORS = frozenset({'repos', 'mecademicpy', 'sample-programs', 'meca500-accessories'})
+
+# Binary chunk index record, one per JSONL line: hash, start_byte, end_byte,
+# chunk_size_bytes, loc start, loc end. Missing values are stored as -1. The
+# layout matches the numpy dtype '<S12,<i8,<i8,<i4,<i4,<i4' for memory mapping.
+CHUNK_INDEX_RECORD = struct.Struct('<12sqqiii')
+
+# Below this many AST files process_directory runs serially; pool start-up
+# would cost more than it saves
+_PARALLEL_MIN_FILES = 16
+
+# Inputs above this size are hashed with BLAKE3's multithreaded mode
+_BLAKE3_THREADED_MIN_BYTES = 1 << 16
+
+
+def _loads_json(data: bytes) -> Any:
+    """Parse JSON bytes, with orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps_json(obj: Any) -> bytes:
+    """Serialize an object to compact JSON bytes, with orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def _pack_index_record(chunk: Dict[str, Any]) -> bytes:
+    """Pack the numeric fields of a chunk into a binary index record."""
+    loc = chunk["loc"] or (-1, -1)
+    return CHUNK_INDEX_RECORD.pack(
+        chunk["hash"].encode('ascii'),
+        -1 if chunk["start_byte"] is None else chunk["start_byte"],
+        -1 if chunk["end_byte"] is None else chunk["end_byte"],
+        chunk["chunk_size_bytes"],
+        -1 if loc[0] is None else loc[0],
+        -1 if loc[1] is None else loc[1]
+    )
+
+
+def index_path_for(jsonl_path: Path) -> Path:
+    """Get the binary index sidecar path for a chunk JSONL file."""
+    return jsonl_path.with_suffix('.idx')
+
+
+def read_chunk_index(index_path: Path) -> List[Tuple[bytes, int, int, int, int, int]]:
+    """
+    Read a binary chunk index written alongside a chunk JSONL file.
+    
+    Args:
+        index_path: Path to the .idx sidecar
+        
+    Returns:
+        (hash, start_byte, end_byte, chunk_size_bytes, loc_start, loc_end)
+        records in JSONL line order
+    """
+    return list(CHUNK_INDEX_RECORD.iter_unpack(index_path.read_bytes()))
+
+
+def _strip_blank_lines(code: str) -> str:
+    """Drop blank and whitespace-only lines from a snippet."""
+    return '\n'.join([line for line in code.split('\n') if line.strip()])
+
+
+def _is_c_comment_line(stripped: str) -> bool:
+    """
+    Check whether a stripped C-like line holds nothing but a comment.
+    
+    Matches `// ...` lines and single-line `/* ... */` blocks, optionally
+    followed by a `//` comment.
+    """
+    if stripped.startswith('//'):
+        return True
+    if not stripped.startswith('/*'):
+        return False
+    return stripped.split('//', 1)[0].rstrip().endswith('*/')
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_file_path(file_path: str) -> str:
+    """
+    Normalize a file path relative to its repo root.
+    
+    Cached at module level since every node of an AST file shares its path.
+    """
+    path = Path(file_path)
+    
+    # Try to make relative to known repo structures
+    parts = path.parts
+    
+    # Look for common repo root indicators
+    for i, part in enumerate(parts):
+        if part in REPO_INDICATORS:
+            # Take everything after the repo indicator
+            if i + 1 < len(parts):
+                relative_parts = parts[i + 1:]
+                return str(Path(*relative_parts))
+    
+    # If no repo structure found, use the last few path components
+    if len(parts) > 3:
+        return str(Path(*parts[-3:]))
+    
+    return str(path)
+
+
+def _find_ast_files(directory: Path) -> Iterator[Path]:
+    """
+    Recursively yield `*_ast.json` files in a single os.scandir traversal.
+    
+    Files come in the same order as `Path.glob("**/*_ast.json")`: each
+    directory's own entries first, then its subdirectories depth-first.
+    Symlinked directories are not followed.
+    """
+    subdirs = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith('_ast.json'):
+                yield Path(entry.path)
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+    for subdir in subdirs:
+        yield from _find_ast_files(Path(subdir))
+
 
 class SemanticCodeChunker:
     """
@@ -23,26 +175,98 @@ class SemanticCodeChunker:
     with hash-based IDs and enhanced metadata.
     """
     
-    def __init__(self, repo_name: str = "meca_samples", commit_hash: Optional[str] = None):
+    # Commit hash shared by all instances, resolved on first use
+    _git_commit_cache: Optional[str] = None
+    
+    def __init__(self, repo_name: str = "meca_samples", commit_hash: Optional[str] = None,
+                 hash_algorithm: str = "sha1", write_index: bool = False):
         """
         Initialize the semantic code chunker.
         
         Args:
             repo_name: Name of the repository
             commit_hash: Git commit hash (auto-detected if None)
+            hash_algorithm: Chunk hash algorithm, "sha1" or "blake3". BLAKE3 is
+                faster but yields different chunk IDs than existing SHA1 data.
+            write_index: Also write a binary .idx sidecar of each JSONL file's
+                numeric fields, for consumers that do not need the text
         """
+        if hash_algorithm not in HASH_ALGORITHMS:
+            raise ValueError(f"Unsupported hash algorithm: {hash_algorithm}")
+        if hash_algorithm == 'blake3' and not BLAKE3_AVAILABLE:
+            raise ImportError("The blake3 package is required for hash_algorithm='blake3'")
+        
         self.repo_name = repo_name
-        self.commit_hash = commit_hash or self._get_git_commit()
+        self.hash_algorithm = hash_algorithm
+        self.write_index = write_index
         
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
         
+        self.commit_hash = commit_hash or self._get_git_commit()
+        
         self.logger.info(f"Initialized code chunker for repo: {repo_name}, commit: {self.commit_hash}")
     
     def _get_git_commit(self) -> str:
         """
         Get the current git commit hash.
         
+        The hash is read from the .git directory when its layout is standard,
+        falling back to `git rev-parse`. The result is cached on the class.
+        
+        Returns:
+            Git commit hash (first 7 characters) or 'unknown'
+        """
+        cls = type(self)
+        if cls._git_commit_cache is None:
+            cls._git_commit_cache = self._read_git_head() or self._run_git_rev_parse()
+        return cls._git_commit_cache
+    
+    def _read_git_head(self) -> Optional[str]:
+        """
+        Resolve HEAD by parsing .git/HEAD and the refs it points to.
+        
+        Returns:
+            Git commit hash (first 7 characters), or None if the repository
+            layout is not a plain .git directory
+        """
+        try:
+            directory = Path(__file__).resolve().parent
+            for candidate in (directory, *directory.parents):
+                git_dir = candidate / '.git'
+                if git_dir.exists():
+                    break
+            else:
+                return None
+            
+            # Worktrees and submodules use a .git file; leave those to git
+            if not git_dir.is_dir():
+                return None
+            
+            head = (git_dir / 'HEAD').read_bytes().strip()
+            if not head.startswith(b'ref: '):
+                return head[:7].decode()
+            
+            ref = head[5:].strip().decode()
+            ref_file = git_dir / ref
+            if ref_file.is_file():
+                return ref_file.read_bytes()[:7].decode()
+            
+            packed_refs = git_dir / 'packed-refs'
+            if packed_refs.is_file():
+                for line in packed_refs.read_bytes().splitlines():
+                    sha, _, name = line.partition(b' ')
+                    if name.decode() == ref:
+                        return sha[:7].decode()
+        except Exception as e:
+            self.logger.debug(f"Could not parse .git directory: {e}")
+        
+        return None
+    
+    def _run_git_rev_parse(self) -> str:
+        """
+        Get the current git commit hash from the git executable.
+        
         Returns:
             Git commit hash (first 7 characters) or 'unknown'
         """
@@ -71,64 +295,45 @@ class SemanticCodeChunker:
         Returns:
             Cleaned code snippet
         """
+        # Fast paths: unhandled languages and snippets without any comment
+        # token only need their blank lines dropped
+        if language == 'python':
+            if '#' not in code:
+                return _strip_blank_lines(code)
+        elif language in C_LIKE_LANGUAGES:
+            if '//' not in code and '/*' not in code:
+                return _strip_blank_lines(code)
+        else:
+            return _strip_blank_lines(code)
+        
         lines = code.split('\n')
-        cleaned_lines = []
         
-        for line in lines:
-            stripped = line.strip()
-            
-            # Skip blank lines
-            if not stripped:
-                continue
-            
-            # Language-specific comment removal
-            if language in ['python']:
-                # Skip single-line comments starting with #
-                if stripped.startswith('#'):
-                    continue
-                # Remove inline comments (basic approach)
-                if '#' in stripped and not stripped.startswith('"') and not stripped.startswith("'"):
-                    # Simple heuristic - remove # and everything after if not in strings
-                    parts = stripped.split('#')
-                    if len(parts) > 1:
-                        # Check if # is likely in a string (very basic check)
-                        quote_count_single = parts[0].count("'")
-                        quote_count_double = parts[0].count('"')
-                        if quote_count_single % 2 == 0 and quote_count_double % 2 == 0:
-                            stripped = parts[0].strip()
-                            if not stripped:
-                                continue
-            
-            elif language in ['javascript', 'c', 'csharp']:
-                # Skip single-line comments starting with //
-                if stripped.startswith('//'):
-                    continue
-                # Remove inline comments (basic approach)
-                if '//' in stripped:
-                    parts = stripped.split('//')
-                    stripped = parts[0].strip()
-                    if not stripped:
-                        continue
-                
-                # Skip single-line /* */ comments
-                if stripped.startswith('/*') and stripped.endswith('*/'):
-                    continue
-            
-            cleaned_lines.append(line)  # Keep original indentation
+        # Language-specific comment removal: only blank and comment-only lines
+        # are dropped, kept lines retain their indentation and inline comments
+        if language == 'python':
+            cleaned_lines = [line for line in lines
+                             if (stripped := line.strip()) and stripped[0] != '#']
+        else:
+            cleaned_lines = [line for line in lines
+                             if (stripped := line.strip()) and not _is_c_comment_line(stripped)]
         
         return '\n'.join(cleaned_lines)
     
     def compute_chunk_hash(self, code: str) -> str:
         """
-        Compute SHA1 hash of code snippet.
+        Compute the hash of a code snippet with the configured algorithm.
         
         Args:
             code: Code snippet
             
         Returns:
-            First 12 characters of SHA1 hash
+            First 12 hex characters of the SHA1 or BLAKE3 hash
         """
-        return hashlib.sha1(code.encode('utf-8')).hexdigest()[:12]
+        data = code.encode('utf-8')
+        if self.hash_algorithm == 'blake3':
+            max_threads = blake3.AUTO if len(data) > _BLAKE3_THREADED_MIN_BYTES else 1
+            return blake3(data, max_threads=max_threads).hexdigest(length=6)
+        return hashlib.sha1(data).hexdigest()[:12]
     
     def extract_symbol_info(self, ast_node: Dict) -> Tuple[Optional[str], Optional[str]]:
         """
@@ -179,26 +384,7 @@ class SemanticCodeChunker:
         Returns:
             Normalized path relative to repo root
         """
-        path = Path(file_path)
-        
-        # Try to make relative to known repo structures
-        parts = path.parts
-        
-        # Look for common repo root indicators
-        repo_indicators = ['repos', 'mecademicpy', 'sample-programs', 'meca500-accessories']
-        
-        for i, part in enumerate(parts):
-            if part in repo_indicators:
-                # Take everything after the repo indicator
-                if i + 1 < len(parts):
-                    relative_parts = parts[i + 1:]
-                    return str(Path(*relative_parts))
-        
-        # If no repo structure found, use the last few path components
-        if len(parts) > 3:
-            return str(Path(*parts[-3:]))
-        
-        return str(path)
+        return _normalize_file_path(file_path)
     
     def process_ast_node(self, ast_node: Dict, source_file: str) -> Dict:
         """
@@ -211,13 +397,16 @@ class SemanticCodeChunker:
         Returns:
             Semantic code chunk dictionary
         """
+        # Bind the lookup once; the node is read a dozen times below
+        node_get = ast_node.get
+        
         # Extract code snippet
-        raw_snippet = ast_node.get('snippet', '')
+        raw_snippet = node_get('snippet', '')
         if not raw_snippet:
             return None
         
         # Get language
-        language = ast_node.get('language', 'unknown')
+        language = node_get('language', 'unknown')
         
         # Clean the code
         cleaned_snippet = self.strip_comments_and_blanks(raw_snippet, language)
@@ -231,13 +420,13 @@ class SemanticCodeChunker:
         symbol_name, qualified_name = self.extract_symbol_info(ast_node)
         
         # Normalize source path
-        normalized_path = self.normalize_file_path(ast_node.get('file_path', source_file))
+        normalized_path = self.normalize_file_path(node_get('file_path', source_file))
         
         # Create chunk ID in the format: {repo}:{file}:{hash}
         chunk_id = f"{self.repo_name}:{normalized_path}:{chunk_hash}"
         
         # Get line location
-        span = ast_node.get('span', [])
+        span = node_get('span', [])
         start_line = span[0] if len(span) > 0 else None
         end_line = span[-1] if len(span) > 1 else start_line
         loc = [start_line, end_line] if start_line is not None else None
@@ -254,65 +443,152 @@ class SemanticCodeChunker:
             "loc": loc,
             "text": cleaned_snippet,
             "hash": chunk_hash,
-            "chunk_type": ast_node.get('chunk_type'),
-            "node_type": ast_node.get('node_type'),
-            "signature": ast_node.get('signature'),
-            "docstring": ast_node.get('docstring'),
+            "chunk_type": node_get('chunk_type'),
+            "node_type": node_get('node_type'),
+            "signature": node_get('signature'),
+            "docstring": node_get('docstring'),
             "chunk_size_bytes": len(cleaned_snippet),
-            "original_size_bytes": ast_node.get('chunk_size_bytes', len(raw_snippet)),
-            "start_byte": ast_node.get('start_byte'),
-            "end_byte": ast_node.get('end_byte')
+            "original_size_bytes": node_get('chunk_size_bytes', len(raw_snippet)),
+            "start_byte": node_get('start_byte'),
+            "end_byte": node_get('end_byte')
         }
         
         return chunk
     
-    def process_ast_file(self, ast_file_path: Path) -> List[Dict]:
+    def iter_ast_file(self, ast_file_path: Path) -> Iterator[Dict]:
         """
-        Process an AST extraction file into semantic code chunks.
+        Lazily process an AST extraction file into semantic code chunks.
         
         Args:
             ast_file_path: Path to AST JSON file
             
-        Returns:
-            List of semantic code chunks
+        Yields:
+            Semantic code chunks, in AST node order
         """
         self.logger.info(f"Processing AST file: {ast_file_path}")
         
         try:
-            with open(ast_file_path, 'r', encoding='utf-8') as f:
-                ast_nodes = json.load(f)
+            ast_nodes = _loads_json(ast_file_path.read_bytes())
         except Exception as e:
             self.logger.error(f"Failed to load AST file {ast_file_path}: {e}")
-            return []
+            return
         
         if not isinstance(ast_nodes, list):
             self.logger.warning(f"Expected list of AST nodes in {ast_file_path}")
-            return []
+            return
         
-        chunks = []
+        # Hoist the bound method and source path out of the per-node loop
+        process_node = self.process_ast_node
+        source_file = str(ast_file_path)
+        chunk_count = 0
         for ast_node in ast_nodes:
-            chunk = self.process_ast_node(ast_node, str(ast_file_path))
+            chunk = process_node(ast_node, source_file)
             if chunk:
-                chunks.append(chunk)
+                chunk_count += 1
+                yield chunk
+        
+        self.logger.info(f"Generated {chunk_count} chunks from {len(ast_nodes)} AST nodes")
+    
+    def process_ast_file(self, ast_file_path: Path) -> List[Dict]:
+        """
+        Process an AST extraction file into semantic code chunks.
+        
+        Args:
+            ast_file_path: Path to AST JSON file
+            
+        Returns:
+            List of semantic code chunks
+        """
+        return list(self.iter_ast_file(ast_file_path))
+    
+    def output_path_for(self, ast_file: Path, output_dir: Path) -> Path:
+        """
+        Get the JSONL output path for an AST file.
+        
+        Args:
+            ast_file: Path to AST JSON file
+            output_dir: Directory to write semantic chunks
+            
+        Returns:
+            Output JSONL path
+        """
+        output_filename = ast_file.stem.replace("_ast", "").replace("_enhanced", "") + "_semantic_chunks.jsonl"
+        return output_dir / output_filename
+    
+    def write_chunk_file(self, ast_file: Path, output_dir: Path) -> Optional[Dict[str, Any]]:
+        """
+        Process one AST file and write its chunks to JSONL.
+        
+        Args:
+            ast_file: Path to AST JSON file
+            output_dir: Directory to write semantic chunks
+            
+        Returns:
+            Per-file statistics, or None if the file produced no chunks
+        """
+        chunks = self.iter_ast_file(ast_file)
+        first_chunk = next(chunks, None)
+        if first_chunk is None:
+            return None
+        
+        output_path = self.output_path_for(ast_file, output_dir)
+        
+        file_stats = {
+            "chunks": 0,
+            "languages": Counter(),
+            "chunk_types": Counter(),
+            "size_min": None,
+            "size_max": None,
+            "size_total": 0
+        }
+        
+        index_records = bytearray() if self.write_index else None
         
-        self.logger.info(f"Generated {len(chunks)} chunks from {len(ast_nodes)} AST nodes")
-        return chunks
+        # Write each chunk as it is produced and update the statistics in the
+        # same pass, so the file's chunks are never held in memory together
+        with open(output_path, 'wb') as f:
+            for chunk in itertools.chain((first_chunk,), chunks):
+                f.write(_dumps_json(chunk) + b'\n')
+                if index_records is not None:
+                    index_records += _pack_index_record(chunk)
+                
+                file_stats["chunks"] += 1
+                file_stats["languages"][chunk.get("lang", "unknown")] += 1
+                file_stats["chunk_types"][chunk.get("chunk_type", "unknown")] += 1
+                
+                size = chunk.get("chunk_size_bytes", 0)
+                file_stats["size_total"] += size
+                if file_stats["size_min"] is None or size < file_stats["size_min"]:
+                    file_stats["size_min"] = size
+                if file_stats["size_max"] is None or size > file_stats["size_max"]:
+                    file_stats["size_max"] = size
+        
+        if index_records is not None:
+            index_path_for(output_path).write_bytes(index_records)
+        
+        self.logger.info(f"Wrote {file_stats['chunks']} chunks to {output_path}")
+        return file_stats
     
-    def process_directory(self, ast_dir: Path, output_dir: Path) -> Dict[str, Any]:
+    def process_directory(self, ast_dir: Path, output_dir: Path,
+                          max_workers: Optional[int] = None) -> Dict[str, Any]:
         """
         Process all AST files in a directory.
         
+        Files are processed in parallel worker processes unless there are
+        only a few of them, where pool start-up would dominate.
+        
         Args:
             ast_dir: Directory containing AST JSON files
             output_dir: Directory to write semantic chunks
+            max_workers: Number of worker processes (defaults to the CPU count)
             
         Returns:
             Processing statistics
         """
         self.logger.info(f"Processing AST directory: {ast_dir}")
         
-        # Find all AST JSON files
-        ast_files = list(ast_dir.glob("**/*_ast.json")) + list(ast_dir.glob("**/*_enhanced_ast.json"))
+        # Find all AST JSON files ("*_ast.json" also covers "*_enhanced_ast.json")
+        ast_files = list(_find_ast_files(ast_dir)) if ast_dir.is_dir() else []
         
         if not ast_files:
             self.logger.warning(f"No AST files found in {ast_dir}")
@@ -321,46 +597,73 @@ class SemanticCodeChunker:
         # Create output directory
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        total_chunks = 0
+        # Files mapping to the same output name must be written by the same
+        # worker, in order, so the last one wins as in a serial run
+        file_groups = {}
+        for ast_file in ast_files:
+            file_groups.setdefault(self.output_path_for(ast_file, output_dir), []).append(ast_file)
+        file_groups = list(file_groups.values())
+        
+        max_workers = max_workers or os.cpu_count() or 1
+        if max_workers > 1 and len(ast_files) >= _PARALLEL_MIN_FILES:
+            # fork skips re-importing this module in every worker
+            mp_context = multiprocessing.get_context("fork") if sys.platform == "linux" else None
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context,
+                                     initializer=_init_worker, initargs=(self,)) as executor:
+                group_results = list(executor.map(_process_file_group, file_groups,
+                                                  [output_dir] * len(file_groups), chunksize=8))
+        else:
+            group_results = [[self.write_chunk_file(ast_file, output_dir) for ast_file in group]
+                             for group in file_groups]
+        
         chunk_stats = {
             "files_processed": 0,
             "chunks_created": 0,
-            "languages": {},
-            "chunk_types": {},
-            "size_stats": []
+            "hash_algorithm": self.hash_algorithm,
+            "languages": Counter(),
+            "chunk_types": Counter(),
+            "size_stats": {}
         }
+        size_min = size_max = None
+        size_total = 0
         
-        for ast_file in ast_files:
-            chunks = self.process_ast_file(ast_file)
+        # Aggregate per-file statistics in the parent
+        for file_stats in (stats for group in group_results for stats in group if stats):
+            chunk_stats["files_processed"] += 1
+            chunk_stats["chunks_created"] += file_stats["chunks"]
             
-            if chunks:
-                # Create output filename
-                output_filename = ast_file.stem.replace("_ast", "").replace("_enhanced", "") + "_semantic_chunks.jsonl"
-                output_path = output_dir / output_filename
-                
-                # Write chunks to JSONL
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    for chunk in chunks:
-                        f.write(json.dumps(chunk) + '\n')
-                
-                # Update statistics
-                chunk_stats["files_processed"] += 1
-                chunk_stats["chunks_created"] += len(chunks)
-                
-                for chunk in chunks:
-                    lang = chunk.get("lang", "unknown")
-                    chunk_type = chunk.get("chunk_type", "unknown")
-                    size = chunk.get("chunk_size_bytes", 0)
-                    
-                    chunk_stats["languages"][lang] = chunk_stats["languages"].get(lang, 0) + 1
-                    chunk_stats["chunk_types"][chunk_type] = chunk_stats["chunk_types"].get(chunk_type, 0) + 1
-                    chunk_stats["size_stats"].append(size)
-                
-                self.logger.info(f"Wrote {len(chunks)} chunks to {output_path}")
+            chunk_stats["languages"].update(file_stats["languages"])
+            chunk_stats["chunk_types"].update(file_stats["chunk_types"])
+            
+            size_total += file_stats["size_total"]
+            size_min = file_stats["size_min"] if size_min is None else min(size_min, file_stats["size_min"])
+            size_max = file_stats["size_max"] if size_max is None else max(size_max, file_stats["size_max"])
+        
+        # Sizes are kept as running aggregates rather than one entry per chunk
+        if chunk_stats["chunks_created"]:
+            chunk_stats["size_stats"] = {
+                "min": size_min,
+                "max": size_max,
+                "mean": size_total / chunk_stats["chunks_created"]
+            }
         
         return chunk_stats
 
 
+# Chunker used by process_directory worker processes
+_worker_chunker: Optional[SemanticCodeChunker] = None
+
+
+def _init_worker(chunker: SemanticCodeChunker) -> None:
+    """Install the parent's chunker in a worker process."""
+    global _worker_chunker
+    _worker_chunker = chunker
+
+
+def _process_file_group(ast_files: List[Path], output_dir: Path) -> List[Optional[Dict[str, Any]]]:
+    """Write the chunks of AST files sharing one output path, in order."""
+    return [_worker_chunker.write_chunk_file(ast_file, output_dir) for ast_file in ast_files]
+
 def main():
     """Example usage of SemanticCodeChunker"""
     
@@ -380,9 +683,8 @@ def main():
         print(f"Chunk types: {dict(stats['chunk_types'])}")
         
         if stats['size_stats']:
-            import numpy as np
-            sizes = np.array(stats['size_stats'])
-            print(f"Size stats (bytes) - Min: {np.min(sizes)}, Max: {np.max(sizes)}, Mean: {np.mean(sizes):.1f}")
+            sizes = stats['size_stats']
+            print(f"Size stats (bytes) - Min: {sizes['min']}, Max: {sizes['max']}, Mean: {sizes['mean']:.1f}")
     else:
         print(f"AST directory not found: {ast_dir}")
 
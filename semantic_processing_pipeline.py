@@ -6,17 +6,81 @@ Main script that orchestrates semantic chunking for both text documents and code
 Provides progress tracking, statistics, and quality reporting.
 """
 
+import functools
 import json
+import re
 import time
 import logging
 from pathlib import Path
 from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from semantic_text_chunker import SemanticTextChunker
-from semantic_code_chunker import SemanticCodeChunker
+from semantic_code_chunker import SemanticCodeChunker, index_path_for, read_chunk_index
 from pdf_processor import process_manual
 
+# Targeted extractors for the one field validate_output reads per chunk.
+# Chunk records are flat, and the same key inside a text field is escaped
+# as \"key\", so only the real field can match.
+_TOKEN_COUNT_RE = re.compile(rb'"token_count"\s*:\s*(\d+)\s*[,}]')
+_CHUNK_SIZE_RE = re.compile(rb'"chunk_size_bytes"\s*:\s*(\d+)\s*[,}]')
+
+
+def _loads_json(data: bytes) -> Any:
+    """Parse JSON bytes, with orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _read_int_field(line: bytes, pattern: re.Pattern, key: str) -> int:
+    """
+    Read one top-level integer field from a JSONL line.
+    
+    The value is pulled out with a regex; the line is only fully parsed when
+    the field is missing or not a plain integer.
+    """
+    match = pattern.search(line)
+    if match:
+        return int(match.group(1))
+    return _loads_json(line).get(key, 0)
+
+
+@functools.lru_cache(maxsize=None)
+def get_text_chunker() -> SemanticTextChunker:
+    """
+    Get the shared text chunker, loading its model on first use.
+    
+    Cached at module level so pipelines created in the same process reuse
+    the loaded embedding model.
+    """
+    logging.getLogger(__name__).info("Initializing semantic text chunker...")
+    return SemanticTextChunker(
+        target_tokens=600,
+        min_tokens=500,
+        max_tokens=700
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_code_chunker() -> SemanticCodeChunker:
+    """Get the shared code chunker."""
+    logging.getLogger(__name__).info("Initializing semantic code chunker...")
+    return SemanticCodeChunker(repo_name="meca_samples")
+
+
+def _count_lines(path: Path) -> int:
+    """Count the lines of a file with a single read."""
+    data = path.read_bytes()
+    return data.count(b'\n') + (1 if data and not data.endswith(b'\n') else 0)
+
 class SemanticProcessingPipeline:
     """
     Unified pipeline for semantic processing of documents and code.
@@ -38,10 +102,6 @@ class SemanticProcessingPipeline:
         self.docs_output_dir.mkdir(parents=True, exist_ok=True)
         self.code_output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Initialize chunkers (lazy loading)
-        self._text_chunker = None
-        self._code_chunker = None
-        
         # Statistics tracking
         self.stats = {
             "start_time": None,
@@ -61,29 +121,23 @@ class SemanticProcessingPipeline:
     @property
     def text_chunker(self) -> SemanticTextChunker:
         """Lazy-load text chunker to avoid loading model unnecessarily."""
-        if self._text_chunker is None:
-            self.logger.info("Initializing semantic text chunker...")
-            self._text_chunker = SemanticTextChunker(
-                target_tokens=600,
-                min_tokens=500,
-                max_tokens=700
-            )
-        return self._text_chunker
+        return get_text_chunker()
     
     @property
     def code_chunker(self) -> SemanticCodeChunker:
         """Lazy-load code chunker."""
-        if self._code_chunker is None:
-            self.logger.info("Initializing semantic code chunker...")
-            self._code_chunker = SemanticCodeChunker(repo_name="meca_samples")
-        return self._code_chunker
+        return get_code_chunker()
     
-    def process_documents(self, manuals_dir: str = "manuals") -> Dict[str, Any]:
+    def process_documents(self, manuals_dir: str = "manuals", max_workers: int = 4) -> Dict[str, Any]:
         """
         Process all PDF documents using semantic chunking.
         
+        Documents are processed in a thread pool so PDF parsing and chunking
+        of one manual overlaps with the file I/O of the others.
+        
         Args:
             manuals_dir: Directory containing PDF manuals
+            max_workers: Number of documents processed concurrently
             
         Returns:
             Processing statistics for documents
@@ -105,31 +159,38 @@ class SemanticProcessingPipeline:
             "files": []
         }
         
-        for pdf_file in pdf_files:
-            try:
-                self.logger.info(f"Processing document: {pdf_file.name}")
-                
-                # Use the process_manual function with semantic chunking
-                process_manual(pdf_file, self.docs_output_dir, use_semantic=True)
-                
-                # Count chunks in output file
-                output_file = self.docs_output_dir / f"{pdf_file.stem}_semantic_chunks.jsonl"
-                if output_file.exists():
-                    chunk_count = sum(1 for _ in open(output_file))
-                    doc_stats["chunks"] += chunk_count
-                    doc_stats["files"].append({
-                        "file": pdf_file.name,
-                        "chunks": chunk_count
-                    })
-                
-                doc_stats["processed"] += 1
-                self.stats["docs_processed"] += 1
-                
-            except Exception as e:
-                error_msg = f"Error processing {pdf_file.name}: {str(e)}"
-                self.logger.error(error_msg)
-                doc_stats["errors"].append(error_msg)
-                self.stats["errors"].append(error_msg)
+        def process_pdf(pdf_file: Path) -> None:
+            self.logger.info(f"Processing document: {pdf_file.name}")
+            
+            # Use the process_manual function with semantic chunking
+            process_manual(pdf_file, self.docs_output_dir, use_semantic=True)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(pdf_file, executor.submit(process_pdf, pdf_file)) for pdf_file in pdf_files]
+            
+            # Collect in submission order so the per-file stats stay deterministic
+            for pdf_file, future in futures:
+                try:
+                    future.result()
+                    
+                    # Count chunks in output file
+                    output_file = self.docs_output_dir / f"{pdf_file.stem}_semantic_chunks.jsonl"
+                    if output_file.exists():
+                        chunk_count = _count_lines(output_file)
+                        doc_stats["chunks"] += chunk_count
+                        doc_stats["files"].append({
+                            "file": pdf_file.name,
+                            "chunks": chunk_count
+                        })
+                    
+                    doc_stats["processed"] += 1
+                    self.stats["docs_processed"] += 1
+                    
+                except Exception as e:
+                    error_msg = f"Error processing {pdf_file.name}: {str(e)}"
+                    self.logger.error(error_msg)
+                    doc_stats["errors"].append(error_msg)
+                    self.stats["errors"].append(error_msg)
         
         self.stats["total_text_chunks"] += doc_stats["chunks"]
         self.logger.info(f"Document processing complete: {doc_stats['processed']} files, {doc_stats['chunks']} chunks")
@@ -217,8 +278,15 @@ class SemanticProcessingPipeline:
         """
         report_file = self.output_base_dir / "processing_report.json"
         
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(stats, f, indent=2, default=str)
+        if ORJSON_AVAILABLE:
+            report_file.write_bytes(orjson.dumps(
+                stats,
+                default=str,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            ))
+        else:
+            with open(report_file, 'w', encoding='utf-8') as f:
+                json.dump(stats, f, indent=2, default=str)
         
         self.logger.info(f"Processing report written to: {report_file}")
         
@@ -245,8 +313,8 @@ class SemanticProcessingPipeline:
                 f.write(f"  Chunk types: {dict(stats['code']['chunk_types'])}\n")
             
             if 'size_stats' in stats['code'] and stats['code']['size_stats']:
-                sizes = np.array(stats['code']['size_stats'])
-                f.write(f"  Size stats (bytes): Min={np.min(sizes)}, Max={np.max(sizes)}, Mean={np.mean(sizes):.1f}\n")
+                sizes = stats['code']['size_stats']
+                f.write(f"  Size stats (bytes): Min={sizes['min']}, Max={sizes['max']}, Mean={sizes['mean']:.1f}\n")
             
             f.write(f"\nTotals:\n")
             f.write(f"  Total files: {stats['totals']['files_processed']}\n")
@@ -282,11 +350,8 @@ class SemanticProcessingPipeline:
         
         doc_token_counts = []
         for doc_file in doc_files:
-            with open(doc_file, 'r') as f:
-                for line in f:
-                    chunk = json.loads(line)
-                    token_count = chunk.get("token_count", 0)
-                    doc_token_counts.append(token_count)
+            doc_token_counts.extend(_read_int_field(line, _TOKEN_COUNT_RE, "token_count")
+                                    for line in doc_file.read_bytes().splitlines())
         
         if doc_token_counts:
             validation_results["docs"]["chunks"] = len(doc_token_counts)
@@ -299,11 +364,13 @@ class SemanticProcessingPipeline:
         
         code_sizes = []
         for code_file in code_files:
-            with open(code_file, 'r') as f:
-                for line in f:
-                    chunk = json.loads(line)
-                    size = chunk.get("chunk_size_bytes", 0)
-                    code_sizes.append(size)
+            # Prefer the binary index sidecar when it is at least as new as the JSONL
+            index_file = index_path_for(code_file)
+            if index_file.exists() and index_file.stat().st_mtime >= code_file.stat().st_mtime:
+                code_sizes.extend(record[3] for record in read_chunk_index(index_file))
+                continue
+            code_sizes.extend(_read_int_field(line, _CHUNK_SIZE_RE, "chunk_size_bytes")
+                              for line in code_file.read_bytes().splitlines())
         
         if code_sizes:
             validation_results["code"]["chunks"] = len(code_sizes)
@@ -11,12 +11,17 @@ Implements semantic chunking for text documents using:
 
 import nltk
 import numpy as np
+import torch
 from typing import List, Dict, Tuple, Optional
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import hashlib
 import logging
+import sqlite3
+import threading
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from chunker_kernels import NUMBA_AVAILABLE, select_chunks
 
 # Download required NLTK data
 try:
@@ -26,6 +31,23 @@ except LookupError:
     nltk.download('punkt')
     nltk.download('punkt_tab')
 
+def _load_sentence_tokenizer():
+    """
+    Load the English Punkt sentence tokenizer used by nltk.sent_tokenize.
+    
+    NLTK 3.8.2+ builds it from punkt_tab; older releases unpickle punkt.
+    """
+    try:
+        from nltk.tokenize import PunktTokenizer
+    except ImportError:
+        return nltk.data.load('tokenizers/punkt/english.pickle')
+    return PunktTokenizer('english')
+
+
+# Exported and quantized ONNX models, one directory per model name
+ONNX_CACHE_DIR = Path.home() / ".cache" / "agentmeca" / "onnx"
+
+
 class SemanticTextChunker:
     """
     Semantic text chunker using greedy max-min algorithm for coherent chunk creation.
@@ -36,7 +58,12 @@ class SemanticTextChunker:
                  target_tokens: int = 600,
                  min_tokens: int = 500,
                  max_tokens: int = 700,
-                 device: str = "auto"):
+                 device: str = "auto",
+                 half_precision: bool = False,
+                 backend: str = "torch",
+                 onnx_quantization: Optional[str] = None,
+                 embedding_cache_path: Optional[str] = None,
+                 compile_model: bool = False):
         """
         Initialize the semantic text chunker.
         
@@ -46,7 +73,28 @@ class SemanticTextChunker:
             min_tokens: Minimum tokens per chunk
             max_tokens: Maximum tokens per chunk
             device: Device to run the model on ("auto", "cpu", "cuda")
+            half_precision: Run the encoder in float16 on CUDA or bfloat16 on
+                CPU. Faster on hardware with native support, at the cost of
+                slightly different embeddings and so possibly different chunks.
+            backend: Encoder backend, "torch" or "onnx" (ONNX Runtime, needs
+                sentence-transformers>=3.2 with the onnx extra)
+            onnx_quantization: Dynamic INT8 quantization config for the ONNX
+                backend ("arm64", "avx2", "avx512" or "avx512_vnni"); the
+                quantized model is exported once and cached under ONNX_CACHE_DIR
+            embedding_cache_path: SQLite file caching sentence embeddings across
+                runs, so repeated sentences are only encoded once (None disables)
+            compile_model: Compile the transformer with torch.compile. Pays off
+                on long batch runs; the first batches of each new shape are slow.
         """
+        if backend not in ("torch", "onnx"):
+            raise ValueError(f"Unsupported backend: {backend}")
+        if backend == "onnx" and half_precision:
+            raise ValueError("half_precision is only supported with the torch backend")
+        if onnx_quantization and backend != "onnx":
+            raise ValueError("onnx_quantization requires backend='onnx'")
+        if compile_model and backend != "torch":
+            raise ValueError("compile_model is only supported with the torch backend")
+        
         self.model_name = model_name
         self.target_tokens = target_tokens
         self.min_tokens = min_tokens
@@ -54,19 +102,82 @@ class SemanticTextChunker:
         
         # Handle device selection
         if device == "auto":
-            import torch
             device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = device
         
         # Initialize the embedding model
         print(f"Loading embedding model: {model_name} on device: {device}")
-        self.model = SentenceTransformer(model_name, device=device)
+        if backend == "onnx":
+            self.model = self._load_onnx_model(model_name, device, onnx_quantization)
+        else:
+            self.model = SentenceTransformer(model_name, device=device)
+        encoder_dtype = "float32"
+        if half_precision:
+            if device.startswith("cuda"):
+                self.model = self.model.half()
+                encoder_dtype = "float16"
+            else:
+                self.model = self.model.to(dtype=torch.bfloat16)
+                encoder_dtype = "bfloat16"
+        if compile_model:
+            # Sentence batches vary in length, so compile for dynamic shapes
+            # rather than recompiling (or capturing CUDA graphs) per shape
+            transformer = self.model[0]
+            transformer.auto_model = torch.compile(transformer.auto_model, dynamic=True)
         
         # Initialize tokenizer for token counting
         self.tokenizer = self.model.tokenizer
         
+        # Load the Punkt sentence tokenizer once instead of looking it up per call
+        self._sent_tokenizer = _load_sentence_tokenizer()
+        
+        # Cache entries are keyed by sentence and encoder configuration, so
+        # caches shared between configurations never return foreign vectors
+        self._embedding_cache = None
+        if embedding_cache_path:
+            self._embedding_cache = sqlite3.connect(embedding_cache_path, check_same_thread=False)
+            self._embedding_cache.execute("CREATE TABLE IF NOT EXISTS emb (h BLOB PRIMARY KEY, v BLOB)")
+            self._embedding_cache_lock = threading.Lock()
+            self._embedding_key_prefix = (
+                f"{model_name}|{backend}|{onnx_quantization}|{encoder_dtype}\0".encode("utf-8")
+            )
+        
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
     
+    @staticmethod
+    def _load_onnx_model(model_name: str, device: str,
+                         quantization: Optional[str]) -> SentenceTransformer:
+        """
+        Load the model on the ONNX Runtime backend, optionally INT8-quantized.
+        
+        Loading goes through SentenceTransformer so the model's own pooling and
+        normalization modules are kept.
+        
+        Args:
+            model_name: Sentence transformer model name
+            device: Device to run the model on
+            quantization: Dynamic quantization config name, or None
+            
+        Returns:
+            SentenceTransformer running on ONNX Runtime
+        """
+        if quantization is None:
+            return SentenceTransformer(model_name, device=device, backend="onnx")
+        
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+        
+        export_dir = ONNX_CACHE_DIR / model_name.replace("/", "--")
+        quantized_file = f"onnx/model_qint8_{quantization}.onnx"
+        if not (export_dir / quantized_file).exists():
+            print(f"Exporting {model_name} to ONNX with {quantization} INT8 quantization")
+            model = SentenceTransformer(model_name, device=device, backend="onnx")
+            model.save(str(export_dir))
+            export_dynamic_quantized_onnx_model(model, quantization, str(export_dir))
+        
+        return SentenceTransformer(str(export_dir), device=device, backend="onnx",
+                                   model_kwargs={"file_name": quantized_file})
+    
     def tokenize_sentences(self, text: str) -> List[str]:
         """
         Tokenize text into sentences using NLTK.
@@ -83,10 +194,10 @@ class SemanticTextChunker:
             return []
         
         # Use NLTK sentence tokenizer
-        sentences = nltk.sent_tokenize(text)
+        sentences = self._sent_tokenizer.tokenize(text)
         
         # Filter out very short sentences and clean whitespace
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 10]
+        sentences = [stripped for s in sentences if len(stripped := s.strip()) > 10]
         
         return sentences
     
@@ -102,23 +213,107 @@ class SemanticTextChunker:
         """
         return len(self.tokenizer.encode(text))
     
+    def count_sentence_tokens(self, sentences: List[str]) -> np.ndarray:
+        """
+        Count the tokens of each sentence with one batched tokenizer call.
+        
+        Special tokens are excluded; a chunk's token count is the sum of its
+        sentences' counts plus `self.tokenizer.num_special_tokens_to_add()`.
+        
+        Args:
+            sentences: List of sentences
+            
+        Returns:
+            Array of per-sentence token counts
+        """
+        if not sentences:
+            return np.array([], dtype=np.int64)
+        
+        encoded = self.tokenizer(sentences, add_special_tokens=False)["input_ids"]
+        return np.array([len(ids) for ids in encoded], dtype=np.int64)
+    
     def compute_embeddings(self, sentences: List[str]) -> np.ndarray:
         """
-        Compute embeddings for a list of sentences.
+        Compute L2-normalized embeddings for a list of sentences.
+        
+        Normalized embeddings make cosine similarity a plain dot product.
+        SentenceTransformer.encode already batches sentences in length order
+        to minimize padding, so they are passed through unsorted.
         
         Args:
             sentences: List of sentences
             
         Returns:
-            Array of embeddings
+            Array of unit-length embeddings
         """
         if not sentences:
             return np.array([])
         
-        embeddings = self.model.encode(sentences, convert_to_numpy=True)
-        return embeddings
+        if self._embedding_cache is not None:
+            return self._compute_embeddings_cached(sentences)
+        return self._encode(sentences)
+    
+    def _encode(self, sentences: List[str]) -> np.ndarray:
+        """Encode sentences into L2-normalized float32 embeddings."""
+        # inference_mode also skips the version counters that no_grad keeps
+        with torch.inference_mode():
+            embeddings = self.model.encode(
+                sentences,
+                batch_size=64,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+        # Similarity math runs as float32 GEMV on C-contiguous rows, whatever
+        # precision and layout the encoder returned
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+    
+    def _compute_embeddings_cached(self, sentences: List[str]) -> np.ndarray:
+        """
+        Compute embeddings through the SQLite cache, encoding only misses.
+        
+        Vectors are stored as float32 so cached and freshly encoded sentences
+        produce identical chunks.
+        
+        Args:
+            sentences: List of sentences
+            
+        Returns:
+            Array of unit-length embeddings
+        """
+        keys = [hashlib.blake2b(self._embedding_key_prefix + sentence.encode("utf-8"),
+                                digest_size=16).digest()
+                for sentence in sentences]
+        
+        vectors = {}
+        with self._embedding_cache_lock:
+            # Stay below SQLite's default limit on bound parameters
+            for start in range(0, len(keys), 900):
+                batch = keys[start:start + 900]
+                placeholders = ",".join("?" * len(batch))
+                vectors.update(self._embedding_cache.execute(
+                    f"SELECT h, v FROM emb WHERE h IN ({placeholders})", batch
+                ))
+        
+        # Encode each missing sentence once, even if it repeats
+        misses = {}
+        for i, key in enumerate(keys):
+            if key not in vectors:
+                misses.setdefault(key, i)
+        
+        if misses:
+            self.logger.info("Encoding %d of %d sentences (cache misses)", len(misses), len(keys))
+            encoded = self._encode([sentences[i] for i in misses.values()])
+            new_rows = [(key, vector.tobytes()) for key, vector in zip(misses, encoded)]
+            vectors.update(new_rows)
+            with self._embedding_cache_lock:
+                self._embedding_cache.executemany("INSERT OR IGNORE INTO emb (h, v) VALUES (?, ?)", new_rows)
+                self._embedding_cache.commit()
+        
+        return np.stack([np.frombuffer(vectors[key], dtype=np.float32) for key in keys])
     
-    def max_min_chunking(self, sentences: List[str], embeddings: np.ndarray) -> List[List[int]]:
+    def max_min_chunking(self, sentences: List[str], embeddings: np.ndarray,
+                         sentence_token_counts: Optional[np.ndarray] = None) -> List[List[int]]:
         """
         Apply greedy max-min algorithm for semantic chunking.
         
@@ -128,9 +323,16 @@ class SemanticTextChunker:
            to the current chunk is maximal
         3. Stop when token limit is reached or no more sentences
         
+        Each sentence's minimum similarity to the chunk is kept in a vector
+        and updated against the newly added sentence only, and chunk token
+        counts are summed from per-sentence counts.
+        
         Args:
             sentences: List of sentences
-            embeddings: Sentence embeddings
+            embeddings: L2-normalized sentence embeddings, as returned by
+                compute_embeddings
+            sentence_token_counts: Per-sentence token counts from
+                count_sentence_tokens (computed if None)
             
         Returns:
             List of chunks, where each chunk is a list of sentence indices
@@ -138,70 +340,165 @@ class SemanticTextChunker:
         if len(sentences) == 0:
             return []
         
+        # A chunk's token count is the sum of its sentences plus the special
+        # tokens added once per sequence
+        if sentence_token_counts is None:
+            sentence_token_counts = self.count_sentence_tokens(sentences)
+        special_tokens = self.tokenizer.num_special_tokens_to_add()
+        
+        # Keep the selection loop on the GPU when the model runs there
+        if self.device.startswith("cuda"):
+            return self._max_min_chunking_torch(
+                torch.as_tensor(embeddings, dtype=torch.float32, device=self.device),
+                sentence_token_counts, special_tokens
+            )
+        
+        # Use the compiled kernel when Numba is installed
+        if NUMBA_AVAILABLE:
+            order, starts = select_chunks(
+                np.ascontiguousarray(embeddings, dtype=np.float32),
+                np.asarray(sentence_token_counts, dtype=np.int64),
+                special_tokens, self.min_tokens, self.max_tokens
+            )
+            return [order[starts[i]:starts[i + 1]].tolist() for i in range(len(starts) - 1)]
+        
         chunks = []
-        remaining_indices = set(range(len(sentences)))
+        remaining = np.ones(len(sentences), dtype=bool)
+        n_remaining = len(sentences)
         
-        while remaining_indices:
+        # Every sentence before the first remaining one is already placed, so
+        # it is found by advancing a cursor rather than rescanning the mask
+        first_remaining = 0
+        
+        while n_remaining:
             # Start new chunk with first remaining sentence
-            current_chunk = [min(remaining_indices)]
-            remaining_indices.remove(current_chunk[0])
+            while not remaining[first_remaining]:
+                first_remaining += 1
+            seed_idx = first_remaining
+            remaining[seed_idx] = False
+            n_remaining -= 1
+            current_chunk = [seed_idx]
+            chunk_tokens = special_tokens + int(sentence_token_counts[seed_idx])
             
-            # Build chunk text for token counting
-            chunk_text = sentences[current_chunk[0]]
-            chunk_tokens = self.count_tokens(chunk_text)
+            # Minimum similarity of every sentence to the current chunk
+            min_similarities = embeddings @ embeddings[seed_idx]
             
             # Greedy max-min selection
-            while remaining_indices and chunk_tokens < self.max_tokens:
-                best_sentence_idx = None
-                best_min_similarity = -1
-                
-                # For each remaining sentence, compute its minimum similarity to current chunk
-                for candidate_idx in remaining_indices:
-                    candidate_embedding = embeddings[candidate_idx].reshape(1, -1)
-                    chunk_embeddings = embeddings[current_chunk]
-                    
-                    # Compute similarities to all sentences in current chunk
-                    similarities = cosine_similarity(candidate_embedding, chunk_embeddings)[0]
-                    min_similarity = np.min(similarities)
-                    
-                    # Check if adding this sentence would exceed token limit
-                    test_text = chunk_text + " " + sentences[candidate_idx]
-                    test_tokens = self.count_tokens(test_text)
-                    
-                    # Select sentence with maximum minimum similarity that fits
-                    if (min_similarity > best_min_similarity and 
-                        test_tokens <= self.max_tokens):
-                        best_min_similarity = min_similarity
-                        best_sentence_idx = candidate_idx
+            while n_remaining and chunk_tokens < self.max_tokens:
+                # Remaining sentences that fit under the token limit compete on
+                # their minimum similarity; ties go to the lowest index
+                fits = remaining & (chunk_tokens + sentence_token_counts <= self.max_tokens)
+                scores = np.where(fits, min_similarities, -np.inf)
+                best_sentence_idx = int(np.argmax(scores))
                 
                 # Add best sentence if found and meets minimum token requirement
-                if best_sentence_idx is not None:
+                if scores[best_sentence_idx] > -1:
                     current_chunk.append(best_sentence_idx)
-                    remaining_indices.remove(best_sentence_idx)
-                    chunk_text += " " + sentences[best_sentence_idx]
-                    chunk_tokens = self.count_tokens(chunk_text)
+                    remaining[best_sentence_idx] = False
+                    n_remaining -= 1
+                    chunk_tokens += int(sentence_token_counts[best_sentence_idx])
+                    min_similarities = np.minimum(min_similarities,
+                                                  embeddings @ embeddings[best_sentence_idx])
                 else:
                     # No suitable sentence found, break if we have minimum tokens
                     if chunk_tokens >= self.min_tokens:
                         break
-                    # Otherwise, add any remaining sentence to meet minimum
-                    elif remaining_indices:
-                        fallback_idx = next(iter(remaining_indices))
-                        current_chunk.append(fallback_idx)
-                        remaining_indices.remove(fallback_idx)
-                        chunk_text += " " + sentences[fallback_idx]
-                        chunk_tokens = self.count_tokens(chunk_text)
-                        break
+                    # Otherwise, add the next remaining sentence to meet minimum
+                    while not remaining[first_remaining]:
+                        first_remaining += 1
+                    fallback_idx = first_remaining
+                    current_chunk.append(fallback_idx)
+                    remaining[fallback_idx] = False
+                    n_remaining -= 1
+                    chunk_tokens += int(sentence_token_counts[fallback_idx])
+                    break
             
             chunks.append(current_chunk)
         
         return chunks
     
+    def _max_min_chunking_torch(self,
+                                embeddings: torch.Tensor,
+                                sentence_token_counts: np.ndarray,
+                                special_tokens: int) -> List[List[int]]:
+        """
+        Max-min chunking with the similarity updates done by torch on device.
+        
+        Same selection rules as the NumPy loop in max_min_chunking; only the
+        per-step index and score cross back to the host.
+        
+        Args:
+            embeddings: L2-normalized float32 embeddings on the target device
+            sentence_token_counts: Per-sentence token counts
+            special_tokens: Special tokens added once per chunk
+            
+        Returns:
+            List of chunks, where each chunk is a list of sentence indices
+        """
+        n_sentences = embeddings.shape[0]
+        token_counts = torch.as_tensor(sentence_token_counts, dtype=torch.int64, device=embeddings.device)
+        remaining = torch.ones(n_sentences, dtype=torch.bool, device=embeddings.device)
+        no_candidate = torch.tensor(float("-inf"), device=embeddings.device)
+        
+        # Host-side mirror of the mask for the first-remaining cursor
+        remaining_host = np.ones(n_sentences, dtype=bool)
+        n_remaining = n_sentences
+        first_remaining = 0
+        
+        chunks = []
+        with torch.inference_mode():
+            while n_remaining:
+                # Start new chunk with first remaining sentence
+                while not remaining_host[first_remaining]:
+                    first_remaining += 1
+                seed_idx = first_remaining
+                remaining[seed_idx] = False
+                remaining_host[seed_idx] = False
+                n_remaining -= 1
+                current_chunk = [seed_idx]
+                chunk_tokens = special_tokens + int(sentence_token_counts[seed_idx])
+                
+                min_similarities = embeddings @ embeddings[seed_idx]
+                
+                # Greedy max-min selection
+                while n_remaining and chunk_tokens < self.max_tokens:
+                    fits = remaining & (token_counts <= self.max_tokens - chunk_tokens)
+                    scores = torch.where(fits, min_similarities, no_candidate)
+                    best_sentence_idx = int(torch.argmax(scores))
+                    
+                    if scores[best_sentence_idx].item() > -1:
+                        current_chunk.append(best_sentence_idx)
+                        remaining[best_sentence_idx] = False
+                        remaining_host[best_sentence_idx] = False
+                        n_remaining -= 1
+                        chunk_tokens += int(sentence_token_counts[best_sentence_idx])
+                        min_similarities = torch.minimum(min_similarities,
+                                                         embeddings @ embeddings[best_sentence_idx])
+                    else:
+                        # No suitable sentence found, break if we have minimum tokens
+                        if chunk_tokens >= self.min_tokens:
+                            break
+                        # Otherwise, add the next remaining sentence to meet minimum
+                        while not remaining_host[first_remaining]:
+                            first_remaining += 1
+                        fallback_idx = first_remaining
+                        current_chunk.append(fallback_idx)
+                        remaining[fallback_idx] = False
+                        remaining_host[fallback_idx] = False
+                        n_remaining -= 1
+                        chunk_tokens += int(sentence_token_counts[fallback_idx])
+                        break
+                
+                chunks.append(current_chunk)
+        
+        return chunks
+    
     def create_chunk_metadata(self, 
                             sentences: List[str], 
                             chunk_indices: List[int], 
                             source_id: str, 
-                            chunk_id: int) -> Dict:
+                            chunk_id: int,
+                            sentence_token_counts: Optional[np.ndarray] = None) -> Dict:
         """
         Create metadata for a chunk.
         
@@ -210,12 +507,18 @@ class SemanticTextChunker:
             chunk_indices: Indices of sentences in this chunk
             source_id: Source document identifier
             chunk_id: Chunk number
+            sentence_token_counts: Per-sentence token counts; when given, the
+                chunk's token count is summed from them instead of re-tokenized
             
         Returns:
             Chunk metadata dictionary
         """
         chunk_text = " ".join(sentences[i] for i in chunk_indices)
-        token_count = self.count_tokens(chunk_text)
+        if sentence_token_counts is not None:
+            token_count = (self.tokenizer.num_special_tokens_to_add()
+                           + int(sentence_token_counts[chunk_indices].sum()))
+        else:
+            token_count = self.count_tokens(chunk_text)
         
         metadata = {
             "chunk_id": f"{source_id}_semantic_{chunk_id}",
@@ -228,7 +531,7 @@ class SemanticTextChunker:
             "char_count": len(chunk_text),
             "chunking_method": "max_min_semantic",
             "model_used": self.model_name,
-            "hash": hashlib.md5(chunk_text.encode()).hexdigest()
+            "hash": hashlib.blake2b(chunk_text.encode("utf-8"), digest_size=16).hexdigest()
         }
         
         return metadata
@@ -244,42 +547,134 @@ class SemanticTextChunker:
         Returns:
             List of chunk dictionaries with metadata
         """
-        self.logger.info(f"Starting semantic chunking for source: {source_id}")
+        self.logger.info("Starting semantic chunking for source: %s", source_id)
         
         # Step 1: Tokenize into sentences
         sentences = self.tokenize_sentences(text)
         if not sentences:
-            self.logger.warning(f"No sentences found in {source_id}")
+            self.logger.warning("No sentences found in %s", source_id)
             return []
         
-        self.logger.info(f"Found {len(sentences)} sentences")
+        self.logger.info("Found %d sentences", len(sentences))
+        
+        # Tokenize all sentences in one batch; chunk token counts are sums
+        sentence_token_counts = self.count_sentence_tokens(sentences)
+        
+        # Documents that fit in a single chunk need no embeddings
+        if self._fits_single_chunk(sentence_token_counts):
+            self.logger.info("Document fits in a single chunk, skipping embeddings")
+            return self._assemble_chunks(sentences, None, sentence_token_counts, source_id)
         
         # Step 2: Compute embeddings
         self.logger.info("Computing sentence embeddings...")
         embeddings = self.compute_embeddings(sentences)
         
-        # Step 3: Apply max-min chunking
+        # Steps 3-4: Apply max-min chunking and create chunk metadata
         self.logger.info("Applying max-min semantic chunking...")
-        chunk_indices_list = self.max_min_chunking(sentences, embeddings)
+        return self._assemble_chunks(sentences, embeddings, sentence_token_counts, source_id)
+    
+    def _fits_single_chunk(self, sentence_token_counts: np.ndarray) -> bool:
+        """Check whether all of a document's sentences fit in one chunk."""
+        return (self.tokenizer.num_special_tokens_to_add()
+                + int(sentence_token_counts.sum())) <= self.max_tokens
+    
+    def _assemble_chunks(self,
+                         sentences: List[str],
+                         embeddings: Optional[np.ndarray],
+                         sentence_token_counts: np.ndarray,
+                         source_id: str) -> List[Dict]:
+        """
+        Group one document's sentences into chunks and build their metadata.
+        
+        Args:
+            sentences: The document's sentences
+            embeddings: Their L2-normalized embeddings, or None when the whole
+                document fits in one chunk (kept in document order)
+            sentence_token_counts: Their token counts
+            source_id: Identifier for the source document
+            
+        Returns:
+            List of chunk dictionaries with metadata
+        """
+        if embeddings is None:
+            chunk_indices_list = [list(range(len(sentences)))]
+        else:
+            chunk_indices_list = self.max_min_chunking(sentences, embeddings, sentence_token_counts)
         
-        # Step 4: Create chunk metadata
         chunks = []
         for i, chunk_indices in enumerate(chunk_indices_list):
             chunk_metadata = self.create_chunk_metadata(
-                sentences, chunk_indices, source_id, i
+                sentences, chunk_indices, source_id, i, sentence_token_counts
             )
             chunks.append(chunk_metadata)
         
-        self.logger.info(f"Created {len(chunks)} semantic chunks")
+        self.logger.info("Created %d semantic chunks for %s", len(chunks), source_id)
         
-        # Log statistics
-        token_counts = [c["token_count"] for c in chunks]
-        self.logger.info(f"Token count stats - Min: {min(token_counts)}, "
-                        f"Max: {max(token_counts)}, "
-                        f"Mean: {np.mean(token_counts):.1f}")
+        # Log statistics, only computed when INFO is enabled
+        if self.logger.isEnabledFor(logging.INFO):
+            token_counts = [c["token_count"] for c in chunks]
+            self.logger.info("Token count stats - Min: %d, Max: %d, Mean: %.1f",
+                             min(token_counts), max(token_counts), np.mean(token_counts))
         
         return chunks
-
+    
+    def chunk_many(self, texts_by_source: Dict[str, str],
+                   max_workers: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """
+        Chunk several documents with a single embedding pass.
+        
+        All documents' sentences are tokenized and encoded together, then the
+        embeddings are split back per document and each document is chunked
+        in a thread pool (the max-min loop is NumPy-bound and releases the GIL).
+        
+        Args:
+            texts_by_source: Mapping of source identifier to document text
+            max_workers: Number of threads for the per-document chunking
+            
+        Returns:
+            Mapping of source identifier to its list of chunk dictionaries
+        """
+        source_ids = list(texts_by_source)
+        doc_sentences = [self.tokenize_sentences(texts_by_source[source_id]) for source_id in source_ids]
+        for source_id, sentences in zip(source_ids, doc_sentences):
+            if not sentences:
+                self.logger.warning("No sentences found in %s", source_id)
+        
+        all_sentences = [sentence for sentences in doc_sentences for sentence in sentences]
+        if not all_sentences:
+            return {source_id: [] for source_id in source_ids}
+        
+        all_token_counts = self.count_sentence_tokens(all_sentences)
+        offsets = np.cumsum([0] + [len(sentences) for sentences in doc_sentences])
+        doc_token_counts = [all_token_counts[offsets[i]:offsets[i + 1]] for i in range(len(source_ids))]
+        
+        # Only documents longer than one chunk go through the embedding pass
+        needs_embeddings = [bool(doc_sentences[i]) and not self._fits_single_chunk(doc_token_counts[i])
+                            for i in range(len(source_ids))]
+        embedded_sentences = [sentence for i, sentences in enumerate(doc_sentences)
+                              if needs_embeddings[i] for sentence in sentences]
+        embedding_offsets = np.cumsum([0] + [len(sentences) if needs_embeddings[i] else 0
+                                             for i, sentences in enumerate(doc_sentences)])
+        
+        all_embeddings = None
+        if embedded_sentences:
+            self.logger.info("Computing embeddings for %d sentences from %d documents...",
+                             len(embedded_sentences), sum(needs_embeddings))
+            all_embeddings = self.compute_embeddings(embedded_sentences)
+        
+        def chunk_document(i: int) -> List[Dict]:
+            if not doc_sentences[i]:
+                return []
+            embeddings = None
+            if needs_embeddings[i]:
+                embeddings = all_embeddings[embedding_offsets[i]:embedding_offsets[i + 1]]
+            return self._assemble_chunks(doc_sentences[i], embeddings,
+                                         doc_token_counts[i], source_ids[i])
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            doc_chunks = list(executor.map(chunk_document, range(len(source_ids))))
+        
+        return dict(zip(source_ids, doc_chunks))
 
 def main():
     """Example usage of SemanticTextChunker"""
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Regression tests for SemanticCodeChunker comment/blank stripping.
+
+The cleaned snippet feeds the chunk hash, so its output must stay stable:
+only blank and comment-only lines are dropped, inline comments are kept.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from semantic_code_chunker import SemanticCodeChunker, index_path_for, read_chunk_index
+
+chunker = SemanticCodeChunker(repo_name="test", commit_hash="0000000")
+
+
+def test_python_stripping():
+    """Comment-only and blank lines go, inline comments and strings stay."""
+    code = (
+        "def f(a):\n"
+        "    \"\"\"Doc # not a comment\"\"\"\n"
+        "    # full-line comment\n"
+        "\n"
+        "    x = \"a#b\"  # trailing\n"
+        "      \t\n"
+        "    return x\n"
+    )
+    expected = (
+        "def f(a):\n"
+        "    \"\"\"Doc # not a comment\"\"\"\n"
+        "    x = \"a#b\"  # trailing\n"
+        "    return x"
+    )
+    assert chunker.strip_comments_and_blanks(code, "python") == expected
+
+
+def test_c_stripping():
+    """Line comments and single-line block comments go, code lines stay."""
+    code = (
+        "int main() { // entry\n"
+        "  // line comment\n"
+        "  /* block */\n"
+        "  /* block */ // and line\n"
+        "  /* multi\n"
+        "     line */\n"
+        "  char *s = \"//not\";\n"
+        "\n"
+        "  return 0; /* x */\n"
+        "}\n"
+    )
+    expected = (
+        "int main() { // entry\n"
+        "  /* multi\n"
+        "     line */\n"
+        "  char *s = \"//not\";\n"
+        "  return 0; /* x */\n"
+        "}"
+    )
+    assert chunker.strip_comments_and_blanks(code, "c") == expected
+
+
+def test_javascript_stripping():
+    """Template literals containing // are left intact."""
+    code = (
+        "// helper\n"
+        "const t = `http://a`;\n"
+        "\n"
+        "const u = 'x'; // note\n"
+    )
+    expected = (
+        "const t = `http://a`;\n"
+        "const u = 'x'; // note"
+    )
+    assert chunker.strip_comments_and_blanks(code, "javascript") == expected
+
+
+def test_snippets_without_comments_drop_blank_lines():
+    """Snippets with no comment token still lose their blank lines."""
+    assert chunker.strip_comments_and_blanks("x = 1\n\n  \ny = 2\n", "python") == "x = 1\ny = 2"
+    assert chunker.strip_comments_and_blanks("int a;\n\t\nint b;", "c") == "int a;\nint b;"
+
+
+def test_unknown_language_drops_blank_lines_only():
+    """Unhandled languages only lose their blank lines."""
+    code = "# kept\n\n  \n// kept\n"
+    assert chunker.strip_comments_and_blanks(code, "unknown") == "# kept\n// kept"
+
+
+def test_chunk_index_matches_jsonl():
+    """The .idx sidecar holds one record per JSONL line with its numeric fields."""
+    nodes = [
+        {"snippet": "x = 1", "language": "python", "span": [3, 4], "start_byte": 10, "end_byte": 15},
+        {"snippet": "# only a comment", "language": "python"},
+        {"snippet": "y = 2", "language": "python"},
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        ast_file = Path(tmp) / "sample_ast.json"
+        ast_file.write_text(json.dumps(nodes))
+        
+        indexing_chunker = SemanticCodeChunker(repo_name="test", commit_hash="0000000", write_index=True)
+        indexing_chunker.write_chunk_file(ast_file, Path(tmp))
+        
+        jsonl_path = indexing_chunker.output_path_for(ast_file, Path(tmp))
+        chunks = [json.loads(line) for line in jsonl_path.read_text().splitlines()]
+        records = read_chunk_index(index_path_for(jsonl_path))
+    
+    assert records == [
+        (chunks[0]["hash"].encode(), 10, 15, 5, 3, 4),
+        (chunks[1]["hash"].encode(), -1, -1, 5, -1, -1),
+    ]
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Python stripping", test_python_stripping),
+        ("C stripping", test_c_stripping),
+        ("JavaScript stripping", test_javascript_stripping),
+        ("Comment-free snippets", test_snippets_without_comments_drop_blank_lines),
+        ("Unknown language", test_unknown_language_drops_blank_lines_only),
+        ("Chunk index sidecar", test_chunk_index_matches_jsonl),
+    ]
+
+    failed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✓ {test_name}")
+        except AssertionError:
+            print(f"✗ {test_name}")
+            failed += 1
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
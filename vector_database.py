@@ -10,6 +10,11 @@ import os
 import json
 import hashlib
 import logging
+import random
+import sqlite3
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple, Union
 import yaml
@@ -19,6 +24,27 @@ from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 import numpy as np
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# libyaml-backed loader when PyYAML was built with it
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+# Chunk fields that are stored as the document or embedding, not as metadata
+EXCLUDED_METADATA_KEYS = frozenset({'text', 'embedding'})
+
+# Recent query embeddings kept per database instance, so repeated queries
+# (retrieval loops, query files) skip the model forward pass
+QUERY_CACHE_SIZE = 256
+
+# Value types ChromaDB stores as-is, matched by exact type before the slower
+# isinstance checks (which also cover subclasses such as numpy scalars)
+CHROMA_METADATA_TYPES = frozenset({str, int, float, bool, type(None)})
+
 
 class VectorDatabase:
     """
@@ -35,13 +61,36 @@ class VectorDatabase:
         self.config = self._load_config(config_path)
         self.logger = self._setup_logging()
         
-        # Initialize models (lazy loading)
+        # Initialize models (lazy loading); one lock per model keeps concurrent
+        # threads from loading the same model twice while still letting the
+        # two models load in parallel
         self._document_model = None
         self._code_model = None
+        self._document_model_lock = threading.Lock()
+        self._code_model_lock = threading.Lock()
         
         # ChromaDB client and collection
         self._client = None
         self._collection = None
+        self._distance_metric = 'l2'
+        
+        # Multi-process encode pools, started on first use per model
+        self._encode_pools = {}
+        self._encode_pools_lock = threading.Lock()
+        
+        # LRU of query embeddings keyed by (model key, query text)
+        self._query_embeddings = OrderedDict()
+        
+        # Persistent embedding cache, keyed by model and text hash; add_chunks
+        # reads and writes it from its encoder thread
+        self._embedding_cache = None
+        self._embedding_cache_lock = threading.Lock()
+        
+        # Content type counters are kept in sync by add_chunks/reset_database
+        # and persisted next to the database; this is the collection size
+        # they were last known to be correct for
+        self._stats_path = None
+        self._stats_synced_total = None
         
         # Statistics
         self.stats = {
@@ -55,7 +104,7 @@ class VectorDatabase:
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from YAML file."""
         with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=YAML_LOADER)
     
     def _setup_logging(self) -> logging.Logger:
         """Setup logging configuration."""
@@ -76,30 +125,95 @@ class VectorDatabase:
     def document_model(self) -> SentenceTransformer:
         """Lazy-load BGE-M3 model for document embeddings."""
         if self._document_model is None:
-            self.logger.info("Loading BGE-M3 model for document embeddings...")
-            model_config = self.config['embeddings']['document_model']
-            self._document_model = SentenceTransformer(
-                model_config['name'],
-                device=model_config.get('device', 'auto')
-            )
-            self.logger.info(f"BGE-M3 model loaded on device: {self._document_model.device}")
+            with self._document_model_lock:
+                if self._document_model is None:
+                    self.logger.info("Loading BGE-M3 model for document embeddings...")
+                    model_config = self.config['embeddings']['document_model']
+                    self._document_model = self._load_model(model_config)
+                    self.logger.info(f"BGE-M3 model loaded on device: {self._document_model.device}")
         return self._document_model
     
     @property 
     def code_model(self) -> SentenceTransformer:
         """Lazy-load code embedding model."""
         if self._code_model is None:
-            model_config = self.config['embeddings']['code_model']
-            model_name = model_config['name']
-            self.logger.info(f"Loading {model_name} model for code embeddings...")
-            self._code_model = SentenceTransformer(
-                model_name,
-                device=model_config.get('device', 'auto'),
-                trust_remote_code=model_config.get('trust_remote_code', False)
-            )
-            self.logger.info(f"{model_name} model loaded on device: {self._code_model.device}")
+            with self._code_model_lock:
+                if self._code_model is None:
+                    model_config = self.config['embeddings']['code_model']
+                    model_name = model_config['name']
+                    self.logger.info(f"Loading {model_name} model for code embeddings...")
+                    self._code_model = self._load_model(
+                        model_config,
+                        trust_remote_code=model_config.get('trust_remote_code', False)
+                    )
+                    self.logger.info(f"{model_name} model loaded on device: {self._code_model.device}")
         return self._code_model
     
+    def _load_model(self, model_config: Dict[str, Any], **kwargs) -> SentenceTransformer:
+        """
+        Load a SentenceTransformer on the backend selected in its model config.
+        
+        With `backend: onnx` the model runs on ONNX Runtime. Setting
+        `onnx_quantization` (e.g. 'avx2', 'avx512_vnni', 'arm64') exports a
+        dynamically INT8-quantized copy once under storage.onnx_directory and
+        loads that on later runs.
+        
+        Args:
+            model_config: Model section of the embeddings config
+            **kwargs: Extra SentenceTransformer arguments
+            
+        Returns:
+            Loaded SentenceTransformer
+        """
+        model_name = model_config['name']
+        device = model_config.get('device', 'auto')
+        backend = model_config.get('backend', 'torch')
+        quantization = model_config.get('onnx_quantization')
+        
+        precision = model_config.get('precision', 'fp32')
+        if precision not in ('fp32', 'fp16', 'bf16'):
+            raise ValueError(f"Unsupported embedding precision: {precision}")
+        
+        if backend == 'torch':
+            if quantization:
+                raise ValueError("onnx_quantization requires backend 'onnx'")
+            model = SentenceTransformer(model_name, device=device, **kwargs)
+            
+            # Half precision only pays off on GPU tensor cores
+            if precision != 'fp32':
+                if model.device.type != 'cuda':
+                    self.logger.warning(f"Precision {precision} needs a CUDA device, keeping fp32 for {model_name}")
+                elif precision == 'fp16':
+                    model.half()
+                else:
+                    model.bfloat16()
+            return model
+        if backend != 'onnx':
+            raise ValueError(f"Unsupported embedding backend: {backend}")
+        if precision != 'fp32':
+            raise ValueError("precision fp16/bf16 requires backend 'torch'")
+        
+        model_kwargs = {"provider": model_config.get('provider', 'CPUExecutionProvider')}
+        if quantization is None:
+            return SentenceTransformer(model_name, device=device, backend='onnx',
+                                       model_kwargs=model_kwargs, **kwargs)
+        
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+        
+        onnx_dir = Path(self.config['storage'].get('onnx_directory', './vector_db/onnx'))
+        export_dir = onnx_dir / model_name.replace('/', '--')
+        quantized_file = f"onnx/model_qint8_{quantization}.onnx"
+        if not (export_dir / quantized_file).exists():
+            self.logger.info(f"Exporting {model_name} to ONNX with {quantization} INT8 quantization...")
+            model = SentenceTransformer(model_name, device=device, backend='onnx',
+                                        model_kwargs=model_kwargs, **kwargs)
+            model.save(str(export_dir))
+            export_dynamic_quantized_onnx_model(model, quantization, str(export_dir))
+        
+        model_kwargs["file_name"] = quantized_file
+        return SentenceTransformer(str(export_dir), device=device, backend='onnx',
+                                   model_kwargs=model_kwargs, **kwargs)
+    
     def initialize_database(self) -> None:
         """Initialize ChromaDB client and collection."""
         self.logger.info("Initializing ChromaDB...")
@@ -107,6 +221,14 @@ class VectorDatabase:
         # Create database directory
         db_path = Path(self.config['database']['path'])
         db_path.mkdir(parents=True, exist_ok=True)
+        self._stats_path = db_path / 'stats.json'
+        
+        # Open the embedding cache if configured
+        cache_path = self.config['storage'].get('embedding_cache')
+        if cache_path and self._embedding_cache is None:
+            Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+            self._embedding_cache = sqlite3.connect(cache_path, check_same_thread=False)
+            self._embedding_cache.execute("CREATE TABLE IF NOT EXISTS emb (h BLOB PRIMARY KEY, v BLOB)")
         
         # Initialize ChromaDB client
         self._client = chromadb.PersistentClient(
@@ -123,36 +245,83 @@ class VectorDatabase:
             self._collection = self._client.get_collection(collection_name)
             self.logger.info(f"Loaded existing collection: {collection_name}")
             
+            # The metric is fixed when a collection is created
+            self._distance_metric = (self._collection.metadata or {}).get('hnsw:space', 'l2')
+            
             # Update stats
-            self.stats["total_chunks"] = self._collection.count()
             self._update_content_type_stats()
             
         except Exception:
+            self._distance_metric = self.config['database'].get('distance_metric', 'cosine')
             self._collection = self._client.create_collection(
                 name=collection_name,
-                metadata={"description": "Mecademic documentation and code chunks"}
+                metadata={
+                    "description": "Mecademic documentation and code chunks",
+                    "hnsw:space": self._distance_metric
+                }
             )
             self.logger.info(f"Created new collection: {collection_name}")
+            self._stats_synced_total = 0
+            self._save_content_type_stats()
     
     def _update_content_type_stats(self) -> None:
-        """Update statistics based on content types in the collection."""
+        """
+        Update statistics based on content types in the collection.
+        
+        The counters are trusted while the collection size matches the size
+        they were last synced at. Otherwise they come from stats.json when it
+        matches the collection, and only as a last resort from a rescan.
+        """
         if not self._collection:
             return
-            
-        # Get all metadata to count content types
+        
+        total = self._collection.count()
+        self.stats["total_chunks"] = total
+        if total == self._stats_synced_total:
+            return
+        
+        try:
+            with open(self._stats_path, 'r') as f:
+                saved = json.load(f)
+            if (saved.get('collection_name') == self.config['database']['collection_name']
+                    and saved.get('total_chunks') == total):
+                self.stats["document_chunks"] = saved['document_chunks']
+                self.stats["code_chunks"] = saved['code_chunks']
+                self._stats_synced_total = total
+                return
+        except (OSError, ValueError, KeyError):
+            pass
+        
+        # Count IDs per content type; Collection.count() takes no filter, and
+        # include=[] keeps metadata and documents out of the results
         try:
-            results = self._collection.get(include=['metadatas'])
-            doc_count = sum(1 for meta in results['metadatas'] 
-                          if meta and meta.get('content_type') == 'document')
-            code_count = sum(1 for meta in results['metadatas'] 
-                           if meta and meta.get('content_type') == 'code')
+            for content_type in ('document', 'code'):
+                results = self._collection.get(where={"content_type": content_type}, include=[])
+                self.stats[f"{content_type}_chunks"] = len(results['ids'])
             
-            self.stats["document_chunks"] = doc_count
-            self.stats["code_chunks"] = code_count
+            self._stats_synced_total = total
+            self._save_content_type_stats()
             
         except Exception as e:
             self.logger.warning(f"Could not update content type stats: {e}")
     
+    def _save_content_type_stats(self) -> None:
+        """Persist the content type counters to stats.json next to the database."""
+        if self._stats_path is None:
+            return
+        
+        saved = {
+            "collection_name": self.config['database']['collection_name'],
+            "total_chunks": self.stats["total_chunks"],
+            "document_chunks": self.stats["document_chunks"],
+            "code_chunks": self.stats["code_chunks"]
+        }
+        try:
+            with open(self._stats_path, 'w') as f:
+                json.dump(saved, f)
+        except OSError as e:
+            self.logger.warning(f"Could not save content type stats: {e}")
+    
     def generate_embedding(self, text: str, content_type: str) -> np.ndarray:
         """
         Generate embedding for text using appropriate model based on content type.
@@ -164,21 +333,167 @@ class VectorDatabase:
         Returns:
             Embedding vector as numpy array
         """
-        if content_type == 'document':
-            return self.document_model.encode([text], convert_to_numpy=True)[0]
-        elif content_type == 'code':
-            return self.code_model.encode([text], convert_to_numpy=True)[0]
-        else:
-            self.logger.warning(f"Unknown content type '{content_type}', using document model")
-            return self.document_model.encode([text], convert_to_numpy=True)[0]
+        return self.generate_embeddings([text], [content_type])[0]
     
-    def add_chunks(self, chunks: List[Dict[str, Any]], batch_size: int = 100) -> Dict[str, Any]:
+    def generate_embeddings(self, texts: List[str], content_types: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for many texts with one batched encode call per model.
+        
+        Args:
+            texts: Texts to embed
+            content_types: Content type of each text ('document' or 'code')
+            
+        Returns:
+            C-contiguous float32 matrix with one row per text, in input order
+        """
+        doc_indices = []
+        code_indices = []
+        for idx, content_type in enumerate(content_types):
+            if content_type == 'code':
+                code_indices.append(idx)
+            else:
+                if content_type != 'document':
+                    self.logger.warning(f"Unknown content type '{content_type}', using document model")
+                doc_indices.append(idx)
+        
+        embeddings = None
+        for indices, model_key in ((doc_indices, 'document_model'), (code_indices, 'code_model')):
+            if not indices:
+                continue
+            
+            group_texts = [texts[idx] for idx in indices]
+            if self._embedding_cache is not None:
+                group_embeddings = self._encode_cached(model_key, group_texts)
+            else:
+                # Encode each distinct text once, even if it repeats
+                unique_texts = list(dict.fromkeys(group_texts))
+                group_embeddings = self._encode(model_key, unique_texts)
+                if len(unique_texts) < len(group_texts):
+                    positions = {text: pos for pos, text in enumerate(unique_texts)}
+                    group_embeddings = group_embeddings[[positions[text] for text in group_texts]]
+            
+            # Scatter the group back to the callers' order
+            if embeddings is None:
+                embeddings = np.empty((len(texts), group_embeddings.shape[1]), dtype=np.float32)
+            embeddings[indices] = group_embeddings
+        
+        if embeddings is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return embeddings
+    
+    def _encode(self, model_key: str, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts with one of the embedding models.
+        
+        Args:
+            model_key: 'document_model' or 'code_model'
+            texts: Texts to embed
+            
+        Returns:
+            Embedding matrix with one row per text
+        """
+        model = getattr(self, model_key)
+        model_config = self.config['embeddings'][model_key]
+        batch_size = model_config.get('batch_size', 32)
+        
+        # Spread large inputs over worker processes (one per GPU, or several
+        # CPU workers); single queries are not worth the round trip
+        if self.config['embeddings'].get('multi_process', False) and len(texts) > batch_size:
+            with self._encode_pools_lock:
+                pool = self._encode_pools.get(model_key)
+                if pool is None:
+                    self.logger.info(f"Starting multi-process encode pool for {model_config['name']}...")
+                    pool = model.start_multi_process_pool(self.config['embeddings'].get('multi_process_devices'))
+                    self._encode_pools[model_key] = pool
+            embeddings = model.encode_multi_process(texts, pool, batch_size=batch_size)
+            return np.asarray(embeddings, dtype=np.float32)
+        
+        if model_config.get('precision', 'fp32') != 'fp32' and model.device.type == 'cuda':
+            # Keep half-precision outputs on the GPU and cast back to fp32 once
+            embeddings = model.encode(
+                texts,
+                batch_size=batch_size,
+                convert_to_tensor=True,
+                show_progress_bar=False
+            )
+            return embeddings.float().cpu().numpy()
+        
+        return model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+    
+    def _encode_cached(self, model_key: str, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts through the embedding cache, encoding only misses.
+        
+        Keys cover the model name and backend, so changing either in the
+        config never returns stale vectors. The model itself is only loaded
+        when something misses.
+        
+        Args:
+            model_key: 'document_model' or 'code_model'
+            texts: Texts to embed
+            
+        Returns:
+            Float32 embedding matrix with one row per text
+        """
+        model_config = self.config['embeddings'][model_key]
+        key_prefix = (
+            f"{model_config['name']}|{model_config.get('backend', 'torch')}|"
+            f"{model_config.get('onnx_quantization')}|{model_config.get('precision', 'fp32')}\0"
+        ).encode('utf-8')
+        keys = [hashlib.blake2b(key_prefix + text.encode('utf-8'), digest_size=16).digest()
+                for text in texts]
+        
+        vectors = {}
+        with self._embedding_cache_lock:
+            # Stay below SQLite's default limit on bound parameters
+            for start in range(0, len(keys), 900):
+                batch = keys[start:start + 900]
+                placeholders = ",".join("?" * len(batch))
+                vectors.update(self._embedding_cache.execute(
+                    f"SELECT h, v FROM emb WHERE h IN ({placeholders})", batch
+                ))
+        
+        # Encode each missing text once, even if it repeats
+        misses = {}
+        n_missed = 0
+        for idx, key in enumerate(keys):
+            if key not in vectors:
+                n_missed += 1
+                misses.setdefault(key, idx)
+        
+        # Encoder threads share the counters
+        with self._embedding_cache_lock:
+            self.stats["embedding_cache_hits"] += len(keys) - n_missed
+            self.stats["embedding_cache_misses"] += n_missed
+        
+        if misses:
+            encoded = np.asarray(self._encode(model_key, [texts[idx] for idx in misses.values()]),
+                                 dtype=np.float32)
+            new_rows = [(key, vector.tobytes()) for key, vector in zip(misses, encoded)]
+            vectors.update(new_rows)
+            with self._embedding_cache_lock:
+                self._embedding_cache.executemany("INSERT OR IGNORE INTO emb (h, v) VALUES (?, ?)", new_rows)
+                self._embedding_cache.commit()
+        
+        return np.stack([np.frombuffer(vectors[key], dtype=np.float32) for key in keys])
+    
+    def add_chunks(self, chunks: List[Dict[str, Any]], batch_size: int = 100,
+                   encode_workers: int = 1) -> Dict[str, Any]:
         """
         Add chunks to the vector database in batches.
         
+        Embedding runs on encoder threads ahead of the single thread that
+        writes to the collection.
+        
         Args:
             chunks: List of chunk dictionaries
             batch_size: Number of chunks to process per batch
+            encode_workers: Number of batches embedded concurrently
             
         Returns:
             Processing statistics
@@ -186,72 +501,120 @@ class VectorDatabase:
         if not self._collection:
             raise RuntimeError("Database not initialized. Call initialize_database() first.")
         
+        if encode_workers < 1:
+            raise ValueError(f"encode_workers must be at least 1, got {encode_workers}")
+        
         self.logger.info(f"Adding {len(chunks)} chunks to database...")
         
         processed = 0
         errors = []
         doc_chunks_added = 0
         code_chunks_added = 0
+        total_before = self._collection.count()
         
-        # Process in batches
-        for i in range(0, len(chunks), batch_size):
-            batch = chunks[i:i + batch_size]
-            
-            try:
-                # Prepare batch data
-                ids = []
-                embeddings = []
-                metadatas = []
-                documents = []
+        # Embedded batches are buffered and written with one collection.add()
+        # per insert_batch_size chunks, so Chroma commits once per group
+        insert_batch_size = self.config['database'].get('insert_batch_size', 1000)
+        get_max_batch_size = getattr(self._client, 'get_max_batch_size', None)
+        if get_max_batch_size is not None:
+            insert_batch_size = min(insert_batch_size, get_max_batch_size())
+        pending = self._new_pending_insert()
+        
+        # Process in batches; encoder threads embed up to encode_workers
+        # batches ahead while this one is sanitized and inserted
+        batch_starts = range(0, len(chunks), batch_size)
+        with ThreadPoolExecutor(max_workers=encode_workers) as encoder:
+            embedded_batches = deque(encoder.submit(self._embed_batch, chunks[start:start + batch_size])
+                                     for start in batch_starts[:encode_workers])
+            for batch_number, i in enumerate(batch_starts):
+                batch = chunks[i:i + batch_size]
+                embedded = embedded_batches.popleft()
+                if batch_number + encode_workers < len(batch_starts):
+                    start = batch_starts[batch_number + encode_workers]
+                    embedded_batches.append(encoder.submit(self._embed_batch, chunks[start:start + batch_size]))
                 
-                for chunk in batch:
-                    chunk_id = chunk.get('chunk_id', f'chunk_{i}_{processed}')
-                    text = chunk.get('text', '')
-                    content_type = chunk.get('content_type', 'document')
+                try:
+                    documents, content_types, embeddings = embedded.result()
                     
-                    # Generate embedding
-                    embedding = self.generate_embedding(text, content_type)
+                    # Prepare batch data; embeddings already arrive as one
+                    # converted matrix, so only IDs and metadata are built here
+                    ids = [None] * len(batch)
+                    metadatas = [None] * len(batch)
                     
-                    # Prepare metadata (exclude large fields)
-                    metadata = {k: v for k, v in chunk.items() 
-                              if k not in ['text', 'embedding'] and v is not None}
+                    for j, chunk in enumerate(batch):
+                        chunk_id = chunk.get('chunk_id')
+                        if chunk_id is None:
+                            chunk_id = f'chunk_{i}_{processed + pending["chunks"]}'
+                        
+                        # Prepare metadata (exclude large fields)
+                        metadata = {k: v for k, v in chunk.items()
+                                    if v is not None and k not in EXCLUDED_METADATA_KEYS}
+                        
+                        # Ensure metadata values are JSON serializable
+                        ids[j] = chunk_id
+                        metadatas[j] = self._sanitize_metadata(metadata)
                     
-                    # Ensure metadata values are JSON serializable
-                    metadata = self._sanitize_metadata(metadata)
+                    # Chroma rejects an add() with repeated IDs; keep that failure
+                    # local to this batch rather than the whole insert group
+                    if len(set(ids)) != len(ids):
+                        raise ValueError("Duplicate chunk IDs within batch")
                     
-                    ids.append(chunk_id)
-                    embeddings.append(embedding.tolist())
-                    metadatas.append(metadata)
-                    documents.append(text)
+                    # Queue the batch; IDs already queued are skipped, as Chroma
+                    # does for IDs that are already stored
+                    for row in zip(ids, embeddings, metadatas, documents):
+                        if row[0] not in pending["id_set"]:
+                            pending["id_set"].add(row[0])
+                            pending["ids"].append(row[0])
+                            pending["embeddings"].append(row[1])
+                            pending["metadatas"].append(row[2])
+                            pending["documents"].append(row[3])
+                    pending["batches"].append(i // batch_size + 1)
+                    pending["chunks"] += len(batch)
+                    pending["document_chunks"] += content_types.count('document')
+                    pending["code_chunks"] += content_types.count('code')
                     
-                    # Update counters
-                    if content_type == 'document':
-                        doc_chunks_added += 1
-                    else:
-                        code_chunks_added += 1
+                except Exception as e:
+                    error_msg = f"Error processing batch {i//batch_size + 1}: {str(e)}"
+                    self.logger.error(error_msg)
+                    errors.append(error_msg)
                 
-                # Add batch to collection
-                self._collection.add(
-                    ids=ids,
-                    embeddings=embeddings,
-                    metadatas=metadatas,
-                    documents=documents
-                )
-                
-                processed += len(batch)
-                
-                if processed % 500 == 0:
-                    self.logger.info(f"Processed {processed}/{len(chunks)} chunks...")
-                
-            except Exception as e:
-                error_msg = f"Error processing batch {i//batch_size + 1}: {str(e)}"
-                self.logger.error(error_msg)
-                errors.append(error_msg)
+                if pending["batches"] and (len(pending["ids"]) >= insert_batch_size
+                                           or i + batch_size >= len(chunks)):
+                    try:
+                        # Add queued batches to collection
+                        self._collection.add(
+                            ids=pending["ids"],
+                            embeddings=pending["embeddings"],
+                            metadatas=pending["metadatas"],
+                            documents=pending["documents"]
+                        )
+                        
+                        # Update counters once the batches are stored
+                        processed += pending["chunks"]
+                        doc_chunks_added += pending["document_chunks"]
+                        code_chunks_added += pending["code_chunks"]
+                        self.logger.info(f"Processed {processed}/{len(chunks)} chunks...")
+                        
+                    except Exception as e:
+                        batches = pending["batches"]
+                        error_msg = f"Error inserting batches {batches[0]}-{batches[-1]}: {str(e)}"
+                        self.logger.error(error_msg)
+                        errors.append(error_msg)
+                    
+                    pending = self._new_pending_insert()
         
-        # Update statistics
-        self.stats["total_chunks"] = self._collection.count()
-        self.stats["document_chunks"] += doc_chunks_added
-        self.stats["code_chunks"] += code_chunks_added
+        # Update statistics; if Chroma skipped any IDs (e.g. already stored)
+        # the counters can no longer be updated incrementally
+        total_after = self._collection.count()
+        if total_before == self._stats_synced_total and total_after - total_before == processed:
+            self.stats["total_chunks"] = total_after
+            self.stats["document_chunks"] += doc_chunks_added
+            self.stats["code_chunks"] += code_chunks_added
+            self._stats_synced_total = total_after
+            self._save_content_type_stats()
+        else:
+            self._stats_synced_total = None
+            self._update_content_type_stats()
         
         result = {
             "chunks_processed": processed,
@@ -264,24 +627,113 @@ class VectorDatabase:
         self.logger.info(f"Batch processing complete: {processed} chunks processed, {len(errors)} errors")
         return result
     
+    def _embed_batch(self, batch: List[Dict[str, Any]]) -> Tuple[List[str], List[str], List[List[float]]]:
+        """
+        Embed one batch of chunks for add_chunks.
+        
+        Args:
+            batch: Chunk dictionaries
+            
+        Returns:
+            Tuple of (documents, content_types, embeddings) for the batch
+        """
+        documents = [chunk.get('text', '') for chunk in batch]
+        content_types = [chunk.get('content_type', 'document') for chunk in batch]
+        
+        # Generate embeddings for the whole batch at once; chromadb 0.4
+        # only accepts lists, so convert the stacked matrix in one call
+        embeddings = self.generate_embeddings(documents, content_types)
+        if self._distance_metric == 'cosine':
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-12
+        return documents, content_types, embeddings.tolist()
+    
+    @staticmethod
+    def _new_pending_insert() -> Dict[str, Any]:
+        """Create an empty buffer of embedded batches awaiting collection.add()."""
+        return {
+            "ids": [],
+            "id_set": set(),
+            "embeddings": [],
+            "metadatas": [],
+            "documents": [],
+            "batches": [],
+            "chunks": 0,
+            "document_chunks": 0,
+            "code_chunks": 0
+        }
+    
     def _sanitize_metadata(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Sanitize metadata to ensure ChromaDB compatibility."""
-        sanitized = {}
-        
-        for key, value in metadata.items():
-            # ChromaDB only accepts str, int, float, bool, or None
-            if isinstance(value, (str, int, float, bool)) or value is None:
-                sanitized[key] = value
-            elif isinstance(value, list):
-                # Convert lists to comma-separated strings
-                if all(isinstance(x, (str, int, float)) for x in value):
-                    sanitized[key] = ','.join(map(str, value))
-                else:
-                    sanitized[key] = str(value)
-            else:
-                sanitized[key] = str(value)
+        return {
+            key: value if type(value) in CHROMA_METADATA_TYPES else self._sanitize_metadata_value(value)
+            for key, value in metadata.items()
+        }
+    
+    @staticmethod
+    def _sanitize_metadata_value(value: Any) -> Any:
+        """Convert a metadata value that is not a plain scalar for ChromaDB."""
+        # ChromaDB only accepts str, int, float, bool, or None
+        if isinstance(value, (str, int, float, bool)) or value is None:
+            return value
+        elif isinstance(value, list) and all(isinstance(x, (str, int, float)) for x in value):
+            # Convert lists to comma-separated strings
+            return ','.join(map(str, value))
+        
+        # Store nested values as compact JSON so they can be parsed back
+        try:
+            if ORJSON_AVAILABLE:
+                return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+            return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+        except (TypeError, ValueError):
+            return str(value)
+    
+    def embed_query(self, query: str, content_type: Optional[str] = None) -> np.ndarray:
+        """
+        Embed a search query, reusing the embedding of a recent identical query.
+        
+        Args:
+            query: Search query text
+            content_type: 'code' selects the code model; anything else the document model
+            
+        Returns:
+            Query embedding vector
+        """
+        return self.embed_queries([query], content_type)[0]
+    
+    def embed_queries(self, queries: List[str], content_type: Optional[str] = None) -> np.ndarray:
+        """
+        Embed search queries, encoding all uncached queries in one model call.
         
-        return sanitized
+        Args:
+            queries: Search query texts
+            content_type: 'code' selects the code model; anything else the document model
+            
+        Returns:
+            Embedding matrix with one row per query
+        """
+        # Default to document model for mixed or document queries
+        model_key = 'code_model' if content_type == 'code' else 'document_model'
+        
+        embeddings = [self._query_embeddings.get((model_key, query)) for query in queries]
+        missing = list(dict.fromkeys(
+            query for query, embedding in zip(queries, embeddings) if embedding is None
+        ))
+        if missing:
+            encoded = dict(zip(missing, self._encode(model_key, missing)))
+            embeddings = [
+                encoded[query] if embedding is None else embedding
+                for query, embedding in zip(queries, embeddings)
+            ]
+        
+        # Refresh the LRU, evicting the least recently used queries
+        for query, embedding in zip(queries, embeddings):
+            cache_key = (model_key, query)
+            self._query_embeddings[cache_key] = embedding
+            self._query_embeddings.move_to_end(cache_key)
+        while len(self._query_embeddings) > QUERY_CACHE_SIZE:
+            self._query_embeddings.popitem(last=False)
+        
+        return np.stack(embeddings)
     
     def search(self, 
                query: str, 
@@ -300,19 +752,37 @@ class VectorDatabase:
         Returns:
             List of matching chunks with similarity scores
         """
+        return self.search_many([query], content_type, limit, similarity_threshold)[0]
+    
+    def search_many(self, 
+                    queries: List[str], 
+                    content_type: Optional[str] = None,
+                    limit: int = None,
+                    similarity_threshold: float = None) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries with one embedding pass and one collection query.
+        
+        Args:
+            queries: Search query texts
+            content_type: Filter by content type ('document' or 'code')
+            limit: Maximum number of results per query
+            similarity_threshold: Minimum similarity score
+            
+        Returns:
+            One list of matching chunks with similarity scores per query
+        """
         if not self._collection:
             raise RuntimeError("Database not initialized. Call initialize_database() first.")
         
+        if not queries:
+            return []
+        
         # Use config defaults if not specified
         limit = limit or self.config['search']['default_limit']
         similarity_threshold = similarity_threshold or self.config['search']['similarity_threshold']
         
-        # Generate query embedding using appropriate model
-        if content_type == 'code':
-            query_embedding = self.code_model.encode([query], convert_to_numpy=True)[0]
-        else:
-            # Default to document model for mixed or document queries
-            query_embedding = self.document_model.encode([query], convert_to_numpy=True)[0]
+        # Generate query embeddings using appropriate model
+        query_embeddings = self.embed_queries(queries, content_type)
         
         # Build where clause for content type filtering
         where_clause = None
@@ -321,40 +791,88 @@ class VectorDatabase:
         
         # Search in ChromaDB
         results = self._collection.query(
-            query_embeddings=[query_embedding.tolist()],
+            query_embeddings=query_embeddings.tolist(),
             n_results=limit,
             where=where_clause,
             include=['documents', 'metadatas', 'distances']
         )
         
-        # Format results
-        formatted_results = []
-        for i, (doc, metadata, distance) in enumerate(zip(
-            results['documents'][0],
-            results['metadatas'][0],
-            results['distances'][0]
-        )):
-            # Convert distance to similarity score
-            # ChromaDB uses squared Euclidean distance, convert to similarity [0,1]
-            # For normalized embeddings: similarity ≈ 1 / (1 + distance)
-            similarity = 1 / (1 + distance)
+        all_results = []
+        for q in range(len(queries)):
+            # Convert distances to similarity scores in one pass
+            distances = np.asarray(results['distances'][q], dtype=np.float64)
+            if self._distance_metric in ('cosine', 'ip'):
+                # Chroma returns 1 - cosine similarity (1 - dot product for 'ip')
+                similarities = 1.0 - distances
+            else:
+                # Legacy collections use squared Euclidean distance, mapped to
+                # [0,1] as similarity ≈ 1 / (1 + distance)
+                similarities = 1.0 / (1.0 + distances)
+            keep = np.flatnonzero(similarities >= similarity_threshold).tolist()
             
-            if similarity >= similarity_threshold:
-                result = {
-                    'text': doc,
-                    'metadata': metadata,
-                    'similarity_score': similarity,
+            # Format results
+            documents = results['documents'][q]
+            metadatas = results['metadatas'][q]
+            similarities = similarities.tolist()
+            formatted_results = [
+                {
+                    'text': documents[i],
+                    'metadata': metadatas[i],
+                    'similarity_score': similarities[i],
                     'rank': i + 1
                 }
-                formatted_results.append(result)
+                for i in keep
+            ]
+            
+            self.logger.info(f"Search returned {len(formatted_results)} results above threshold {similarity_threshold}")
+            all_results.append(formatted_results)
+        
+        return all_results
+    
+    def check_index(self, sample_size: int = 5) -> Tuple[int, int, int]:
+        """
+        Check a random sample of stored chunks against storage and the ANN index.
+        
+        Each sampled chunk is fetched back by ID and its stored embedding is
+        queried against the index, which should return the chunk itself. No
+        embedding model is needed.
+        
+        Args:
+            sample_size: Number of chunks to sample
+            
+        Returns:
+            Tuple of (chunks sampled, chunks fetched by ID, chunks found by the index)
+        """
+        if not self._collection:
+            raise RuntimeError("Database not initialized. Call initialize_database() first.")
+        
+        total = self._collection.count()
+        sample_size = min(sample_size, total)
+        if sample_size == 0:
+            return 0, 0, 0
+        
+        sample = self._collection.get(
+            limit=sample_size,
+            offset=random.randint(0, total - sample_size),
+            include=['embeddings']
+        )
+        ids = sample['ids']
         
-        self.logger.info(f"Search returned {len(formatted_results)} results above threshold {similarity_threshold}")
-        return formatted_results
+        fetched = self._collection.get(ids=ids, include=[])
+        
+        # Identical chunks share an embedding, so look past the first hit
+        results = self._collection.query(
+            query_embeddings=np.asarray(sample['embeddings'], dtype=np.float32).tolist(),
+            n_results=min(10, total),
+            include=[]
+        )
+        found = sum(chunk_id in hits for chunk_id, hits in zip(ids, results['ids']))
+        
+        return len(ids), len(fetched['ids']), found
     
     def get_stats(self) -> Dict[str, Any]:
         """Get database statistics."""
         if self._collection:
-            self.stats["total_chunks"] = self._collection.count()
             self._update_content_type_stats()
         
         return {
@@ -380,11 +898,20 @@ class VectorDatabase:
                 "document_chunks": 0,
                 "code_chunks": 0
             })
+            self._stats_synced_total = None
+            self._save_content_type_stats()
             
             self.logger.info("Database reset successfully")
     
     def close(self) -> None:
         """Close database connections and cleanup."""
+        for pool in self._encode_pools.values():
+            SentenceTransformer.stop_multi_process_pool(pool)
+        self._encode_pools = {}
+        
+        if self._embedding_cache is not None:
+            self._embedding_cache.close()
+            self._embedding_cache = None
         self._client = None
         self._collection = None
         self.logger.info("Database connections closed")
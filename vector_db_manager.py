@@ -7,15 +7,71 @@ statistics, backup, and maintenance operations.
 """
 
 import argparse
+import contextlib
+import io
 import json
+import os
+import socket
+import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any, List
 import shutil
 
-from vector_database import create_database
-from ingest_chunks import ChunkIngester
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Unix socket a `daemon` listens on and `--daemon` clients connect to
+DEFAULT_SOCKET_PATH = "~/.cache/agentmeca/vdb.sock"
+
+# Commands a daemon will not run on behalf of a client
+DAEMON_EXCLUDED_COMMANDS = frozenset({'daemon', 'reset'})
+
+# `stats` output, filled from VectorDatabase.get_stats()
+STATS_TEMPLATE = """Vector Database Statistics
+==============================
+Database path: {database_path}
+Collection: {collection_name}
+Total chunks: {total_chunks:,}
+Document chunks: {document_chunks:,}
+Code chunks: {code_chunks:,}
+
+Models loaded:
+  Document model (BGE-M3): {document_model_mark}
+  Code model (StarCoder2): {code_model_mark}
+"""
+
+# Appended to the `stats` output once the embedding cache has been used
+CACHE_STATS_TEMPLATE = """
+Embedding cache:
+  Hit rate: {hit_rate:.2%}
+  Hits: {embedding_cache_hits:,}
+  Misses: {embedding_cache_misses:,}
+"""
+
+
+def _read_message(sock: socket.socket) -> Any:
+    """Read one JSON message, sent as everything up to the peer's end of writing."""
+    data = []
+    while True:
+        block = sock.recv(65536)
+        if not block:
+            break
+        data.append(block)
+    return json.loads(b"".join(data).decode('utf-8'))
+
+
+def _positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
 
 
 class VectorDBManager:
@@ -36,19 +92,58 @@ class VectorDBManager:
     def _get_database(self):
         """Get database instance (lazy initialization)."""
         if self.db is None:
+            # Imported here so --help and argument errors skip the embedding stack
+            from vector_database import create_database
             self.db = create_database(self.config_path)
         return self.db
     
+    def _copy_database(self, db_path: Path, backup_path: Path):
+        """
+        Copy the database directory, cloning files instead where the filesystem supports it.
+        
+        `cp --reflink=auto` shares extents copy-on-write on btrfs/XFS/APFS-style
+        filesystems and does a plain copy elsewhere. Hardlinks are not used:
+        ChromaDB rewrites its SQLite and HNSW files in place, so a hardlinked
+        backup would change along with the live database.
+        """
+        try:
+            subprocess.run(
+                ["cp", "-R", "--reflink=auto", "--preserve=mode,timestamps",
+                 str(db_path), str(backup_path)],
+                check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            return
+        except (OSError, subprocess.CalledProcessError):
+            # cp missing or without --reflink (BSD/macOS), or the copy failed
+            shutil.rmtree(backup_path, ignore_errors=True)
+        
+        shutil.copytree(db_path, backup_path)
+    
+    def _command_handlers(self) -> Dict[str, Any]:
+        """Map command names to their handlers."""
+        return {
+            'ingest': self.cmd_ingest,
+            'search': self.cmd_search,
+            'stats': self.cmd_stats,
+            'validate': self.cmd_validate,
+            'backup': self.cmd_backup,
+            'reset': self.cmd_reset,
+            'health': self.cmd_health,
+            'daemon': self.cmd_daemon
+        }
+    
     def cmd_ingest(self, args) -> int:
         """Ingest chunks from JSONL files."""
         print("Starting chunk ingestion...")
         
         try:
+            from ingest_chunks import ChunkIngester
             ingester = ChunkIngester(self.config_path)
             
             stats = ingester.ingest_from_directory(
                 source_dir=args.source_dir,
-                batch_size=args.batch_size
+                batch_size=args.batch_size,
+                workers=args.workers
             )
             
             # Generate report if requested
@@ -87,9 +182,16 @@ class VectorDBManager:
     
     def cmd_search(self, args) -> int:
         """Search for similar chunks."""
+        if not args.query and not args.queries_file:
+            print("Error during search: provide a query or --queries-file")
+            return 1
+        
         try:
             db = self._get_database()
             
+            if args.queries_file:
+                return self._search_queries_file(db, args)
+            
             print(f"Searching for: '{args.query}'")
             if args.content_type:
                 print(f"Content type filter: {args.content_type}")
@@ -106,25 +208,7 @@ class VectorDBManager:
             print(f"\nFound {len(results)} results in {search_time:.3f}s")
             print("-" * 60)
             
-            for i, result in enumerate(results, 1):
-                metadata = result['metadata']
-                similarity = result['similarity_score']
-                text = result['text']
-                
-                print(f"\n{i}. Score: {similarity:.3f}")
-                print(f"   Type: {metadata.get('content_type', 'unknown')}")
-                
-                if metadata.get('source'):
-                    print(f"   Source: {metadata['source']}")
-                elif metadata.get('source_path'):
-                    print(f"   File: {metadata['source_path']}")
-                
-                if metadata.get('symbol'):
-                    print(f"   Symbol: {metadata['symbol']}")
-                    
-                # Show text preview
-                text_preview = text[:200] + "..." if len(text) > 200 else text
-                print(f"   Text: {text_preview}")
+            self._print_results(results)
             
             return 0
             
@@ -132,36 +216,82 @@ class VectorDBManager:
             print(f"Error during search: {e}")
             return 1
     
+    def _search_queries_file(self, db, args) -> int:
+        """Search for every query in a file (one per line) in a single batch."""
+        with open(args.queries_file, 'r', encoding='utf-8') as f:
+            queries = [line.strip() for line in f if line.strip()]
+        
+        print(f"Searching for {len(queries)} queries from: {args.queries_file}")
+        if args.content_type:
+            print(f"Content type filter: {args.content_type}")
+        
+        start_time = time.time()
+        all_results = db.search_many(
+            queries,
+            content_type=args.content_type,
+            limit=args.limit,
+            similarity_threshold=args.threshold
+        )
+        search_time = time.time() - start_time
+        
+        print(f"Searched {len(queries)} queries in {search_time:.3f}s")
+        
+        for query, results in zip(queries, all_results):
+            print(f"\nQuery: '{query}'")
+            print(f"Found {len(results)} results")
+            print("-" * 60)
+            self._print_results(results)
+        
+        return 0
+    
+    def _print_results(self, results: List[Dict[str, Any]]):
+        """Print search results with a short text preview."""
+        # Collect all lines and write them at once instead of one print per line
+        out = []
+        for i, result in enumerate(results, 1):
+            metadata = result['metadata']
+            similarity = result['similarity_score']
+            text = result['text']
+            
+            out.append(f"\n{i}. Score: {similarity:.3f}\n")
+            out.append(f"   Type: {metadata.get('content_type', 'unknown')}\n")
+            
+            if metadata.get('source'):
+                out.append(f"   Source: {metadata['source']}\n")
+            elif metadata.get('source_path'):
+                out.append(f"   File: {metadata['source_path']}\n")
+            
+            if metadata.get('symbol'):
+                out.append(f"   Symbol: {metadata['symbol']}\n")
+                
+            # Show text preview
+            text_preview = (text[:200] + "...") if text[200:201] else text
+            out.append(f"   Text: {text_preview}\n")
+        
+        sys.stdout.write("".join(out))
+    
     def cmd_stats(self, args) -> int:
         """Show database statistics."""
         try:
             db = self._get_database()
             stats = db.get_stats()
             
-            print("Vector Database Statistics")
-            print("=" * 30)
-            print(f"Database path: {stats['database_path']}")
-            print(f"Collection: {stats['collection_name']}")
-            print(f"Total chunks: {stats['total_chunks']:,}")
-            print(f"Document chunks: {stats['document_chunks']:,}")
-            print(f"Code chunks: {stats['code_chunks']:,}")
-            
             # Model loading status
             models = stats['models_loaded']
-            print(f"\nModels loaded:")
-            print(f"  Document model (BGE-M3): {'✓' if models['document_model'] else '✗'}")
-            print(f"  Code model (StarCoder2): {'✓' if models['code_model'] else '✗'}")
+            output = STATS_TEMPLATE.format(
+                **stats,
+                document_model_mark='✓' if models['document_model'] else '✗',
+                code_model_mark='✓' if models['code_model'] else '✗'
+            )
             
             # Cache statistics if available
             if 'embedding_cache_hits' in stats:
                 total_requests = stats['embedding_cache_hits'] + stats['embedding_cache_misses']
                 if total_requests > 0:
                     hit_rate = stats['embedding_cache_hits'] / total_requests
-                    print(f"\nEmbedding cache:")
-                    print(f"  Hit rate: {hit_rate:.2%}")
-                    print(f"  Hits: {stats['embedding_cache_hits']:,}")
-                    print(f"  Misses: {stats['embedding_cache_misses']:,}")
+                    output += CACHE_STATS_TEMPLATE.format(**stats, hit_rate=hit_rate)
             
+            sys.stdout.write(output)
             return 0
             
         except Exception as e:
@@ -185,14 +315,18 @@ class VectorDBManager:
             
             print(f"Validating {total_chunks:,} chunks...")
             
-            # Test search functionality
-            print("Testing search functionality...")
+            # Check stored vectors against the index (no model forward pass)
+            print("Testing index integrity...")
             try:
-                # Simple search test
-                test_results = db.search("robot", limit=5)
-                print(f"  ✓ Search test passed - returned {len(test_results)} results")
+                sampled, fetched, found = db.check_index(sample_size=5)
+                if fetched != sampled:
+                    print(f"  ✗ Index test failed - only {fetched} of {sampled} sampled chunks fetched by ID")
+                    return 1
+                print(f"  ✓ Index test passed - {sampled} sampled chunks fetched by ID")
+                if found != sampled:
+                    print(f"  ⚠ Only {found} of {sampled} sampled chunks found by a query with their own embedding")
             except Exception as e:
-                print(f"  ✗ Search test failed: {e}")
+                print(f"  ✗ Index test failed: {e}")
                 return 1
             
             # Check content type distribution
@@ -229,18 +363,33 @@ class VectorDBManager:
             db_path = Path(db.config['database']['path'])
             if db_path.exists():
                 print(f"Creating backup: {backup_path}")
-                shutil.copytree(db_path, backup_path)
+                
+                # Collect stats while the files are copied
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    stats_future = executor.submit(db.get_stats)
+                    self._copy_database(db_path, backup_path)
+                    stats = stats_future.result()
+                
+                # get_stats may have rewritten stats.json mid-copy; copy the
+                # final version now that it is done
+                stats_file = db_path / "stats.json"
+                if stats_file.exists():
+                    shutil.copy2(stats_file, backup_path / "stats.json")
                 
                 # Create backup manifest
                 manifest = {
                     "timestamp": timestamp,
                     "database_path": str(db_path),
                     "backup_path": str(backup_path),
-                    "stats": db.get_stats()
+                    "stats": stats
                 }
                 
-                with open(backup_path / "backup_manifest.json", 'w') as f:
-                    json.dump(manifest, f, indent=2, default=str)
+                if ORJSON_AVAILABLE:
+                    with open(backup_path / "backup_manifest.json", 'wb') as f:
+                        f.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2, default=str))
+                else:
+                    with open(backup_path / "backup_manifest.json", 'w') as f:
+                        json.dump(manifest, f, indent=2, default=str)
                 
                 print(f"Backup created successfully: {backup_path}")
                 return 0
@@ -300,19 +449,21 @@ class VectorDBManager:
             stats = db.get_stats()
             print(f"✓ Database stats retrieved: {stats['total_chunks']} chunks")
             
-            # Check if models can be loaded
-            try:
+            # Check if models can be loaded; both loads run concurrently so
+            # the check takes as long as the slower model
+            with ThreadPoolExecutor(max_workers=2) as executor:
                 # This will trigger lazy loading
-                _ = db.document_model
-                print("✓ Document model (BGE-M3) loaded successfully")
-            except Exception as e:
-                print(f"✗ Document model failed to load: {e}")
-            
-            try:
-                _ = db.code_model
-                print("✓ Code model (StarCoder2-15B) loaded successfully")
-            except Exception as e:
-                print(f"✗ Code model failed to load: {e}")
+                model_loads = [
+                    ("Document model (BGE-M3)", "Document model", executor.submit(getattr, db, 'document_model')),
+                    ("Code model (StarCoder2-15B)", "Code model", executor.submit(getattr, db, 'code_model'))
+                ]
+                
+                for label, short_label, future in model_loads:
+                    try:
+                        future.result()
+                        print(f"✓ {label} loaded successfully")
+                    except Exception as e:
+                        print(f"✗ {short_label} failed to load: {e}")
             
             print("\nHealth check completed")
             return 0
@@ -320,6 +471,98 @@ class VectorDBManager:
         except Exception as e:
             print(f"Health check failed: {e}")
             return 1
+    
+    def cmd_daemon(self, args) -> int:
+        """Serve commands over a unix socket, keeping the database and models loaded."""
+        if not hasattr(socket, 'AF_UNIX'):
+            print("Daemon mode requires unix domain sockets")
+            return 1
+        
+        socket_path = Path(args.socket).expanduser()
+        if self._send_to_daemon(socket_path, None) is not None:
+            print(f"A daemon is already listening on {socket_path}")
+            return 1
+        
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if socket_path.exists():
+            # Left behind by a daemon that did not shut down cleanly
+            socket_path.unlink()
+        
+        self._get_database()
+        handlers = self._command_handlers()
+        
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Only the owning user may connect
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(str(socket_path))
+        finally:
+            os.umask(old_umask)
+        server.listen()
+        print(f"Daemon listening on {socket_path} (Ctrl+C to stop)")
+        
+        try:
+            while True:
+                conn, _ = server.accept()
+                with conn:
+                    try:
+                        request = _read_message(conn)
+                        output = io.StringIO()
+                        if request is None:
+                            # Liveness probe
+                            returncode = 0
+                        elif request.get('command') in DAEMON_EXCLUDED_COMMANDS:
+                            output.write(f"Command not available through the daemon: {request['command']}\n")
+                            returncode = 1
+                        else:
+                            with contextlib.redirect_stdout(output):
+                                returncode = handlers[request['command']](argparse.Namespace(**request))
+                        response = {"returncode": returncode, "output": output.getvalue()}
+                    except Exception as e:
+                        response = {"returncode": 1, "output": f"Daemon error: {e}\n"}
+                    conn.sendall(json.dumps(response).encode('utf-8'))
+        except KeyboardInterrupt:
+            print("\nDaemon stopped")
+        finally:
+            server.close()
+            socket_path.unlink(missing_ok=True)
+            self.db.close()
+        
+        return 0
+    
+    def _send_to_daemon(self, socket_path: Path, args) -> Any:
+        """
+        Run a command in a listening daemon.
+        
+        Args:
+            socket_path: Daemon socket
+            args: Parsed command arguments, or None to only check that a daemon is listening
+            
+        Returns:
+            The command's return code, or None when no daemon is listening
+        """
+        if not hasattr(socket, 'AF_UNIX') or not socket_path.exists():
+            return None
+        
+        request = None
+        if args is not None:
+            request = vars(args).copy()
+            # The daemon may run from another directory
+            for key in ('queries_file', 'source_dir'):
+                if request.get(key):
+                    request[key] = os.path.abspath(request[key])
+        
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(str(socket_path))
+                client.sendall(json.dumps(request).encode('utf-8'))
+                client.shutdown(socket.SHUT_WR)
+                response = _read_message(client)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return None
+        
+        sys.stdout.write(response['output'])
+        return response['returncode']
 
 
 def main():
@@ -334,6 +577,16 @@ def main():
         default="vector_db_config.yaml", 
         help="Configuration file path"
     )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run the command in a running daemon if one is listening (it uses the daemon's configuration)"
+    )
+    parser.add_argument(
+        "--socket",
+        default=DEFAULT_SOCKET_PATH,
+        help="Daemon socket path"
+    )
     
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
@@ -341,11 +594,13 @@ def main():
     ingest_parser = subparsers.add_parser('ingest', help='Ingest chunks from JSONL files')
     ingest_parser.add_argument('--source-dir', help='Directory containing JSONL files')
     ingest_parser.add_argument('--batch-size', type=int, default=100, help='Batch size for processing')
+    ingest_parser.add_argument('--workers', type=_positive_int, default=1, help='Batches embedded concurrently')
     ingest_parser.add_argument('--report', action='store_true', help='Generate detailed report')
     
     # Search command
     search_parser = subparsers.add_parser('search', help='Search for similar chunks')
-    search_parser.add_argument('query', help='Search query')
+    search_parser.add_argument('query', nargs='?', help='Search query')
+    search_parser.add_argument('--queries-file', help='File with one search query per line, searched as one batch')
     search_parser.add_argument('--content-type', choices=['document', 'code'], help='Filter by content type')
     search_parser.add_argument('--limit', type=int, default=10, help='Maximum number of results')
     search_parser.add_argument('--threshold', type=float, default=0.7, help='Similarity threshold')
@@ -366,6 +621,9 @@ def main():
     # Health command
     subparsers.add_parser('health', help='Perform health check')
     
+    # Daemon command
+    subparsers.add_parser('daemon', help='Keep the database loaded and serve commands from --daemon clients')
+    
     # Parse arguments
     args = parser.parse_args()
     
@@ -376,16 +634,14 @@ def main():
     # Initialize manager and run command
     manager = VectorDBManager(args.config)
     
+    # Hand the command to a running daemon, falling back to running it here
+    if args.daemon and args.command not in DAEMON_EXCLUDED_COMMANDS:
+        returncode = manager._send_to_daemon(Path(args.socket).expanduser(), args)
+        if returncode is not None:
+            return returncode
+    
     # Route to appropriate command handler
-    command_handlers = {
-        'ingest': manager.cmd_ingest,
-        'search': manager.cmd_search,
-        'stats': manager.cmd_stats,
-        'validate': manager.cmd_validate,
-        'backup': manager.cmd_backup,
-        'reset': manager.cmd_reset,
-        'health': manager.cmd_health
-    }
+    command_handlers = manager._command_handlers()
     
     handler = command_handlers.get(args.command)
     if handler: